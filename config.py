@@ -23,6 +23,12 @@ else:
     # Em desenvolvimento, usa a pasta local de logs
     LOGS_DIR = os.path.join(BASE_DIR, "logs")
 
+# Dados persistentes (caches, históricos) ficam em AppData/Local quando instalado
+if IS_FROZEN:
+    DATA_DIR = os.path.join(os.path.expanduser('~'), 'AppData', 'Local', 'AEGIS')
+else:
+    DATA_DIR = os.path.join(BASE_DIR, "data")
+
 ASSETS_DIR = os.path.join(BASE_DIR, "assets")
 
 class Config:
@@ -36,6 +42,7 @@ class Config:
     BASE_DIR = BASE_DIR
     ASSETS_DIR = ASSETS_DIR
     LOGS_DIR = LOGS_DIR
+    DATA_DIR = DATA_DIR
     
     # Chaves de API
     DEEPSEEK_API_KEY = os.getenv('DEEPSEEK_API_KEY')
@@ -58,7 +65,20 @@ class Config:
     VOICE_RATE = float(os.getenv('VOICE_RATE', '1.0'))
     
     # Configuração de monitoramento de tela
-    SCREEN_MONITOR_INTERVAL = int(os.getenv('SCREEN_MONITOR_INTERVAL', '15'))  # em segundos
+    SCREEN_MONITOR_INTERVAL = int(os.getenv('SCREEN_MONITOR_INTERVAL', '15'))  # intervalo máximo, em segundos
+    SCREEN_MONITOR_MIN_INTERVAL = 1.0  # intervalo enquanto a tela está mudando
+    SCREEN_IDLE_SECONDS = 60  # sem entrada do usuário por esse tempo: captura no intervalo máximo
+    SCREEN_CPU_BUDGET = 0.05  # fração máxima de um núcleo gasta com capturas
+    SCREEN_OCR_BAND_HEIGHT = 96  # altura máxima (px) de uma faixa reconhecida de uma vez
+    SCREEN_OCR_LANGUAGE = os.getenv('SCREEN_OCR_LANGUAGE', 'eng')  # idiomas do Tesseract (ex.: 'por+eng')
+    SCREEN_HISTORY = os.getenv('SCREEN_HISTORY', '1') == '1'  # mantém os quadros recentes em memória
+    SCREEN_HISTORY_BYTES = 16 * 1024 * 1024  # limite de memória do histórico de quadros
+    SCREEN_HISTORY_MAX_WIDTH = 960  # largura máxima dos quadros armazenados
+    SCREEN_HISTORY_MAX_FRAMES = 600
+
+    # Alertas agendados (persistidos entre execuções)
+    ALERTS_DB = os.path.join(DATA_DIR, 'alerts.sqlite3')
+    ALERT_MISFIRE_GRACE = 3600  # segundos de atraso em que um alerta perdido ainda é disparado
     
     # Configuração de contexto de código
     MAX_CODE_CONTEXT = int(os.getenv('MAX_CODE_CONTEXT', '4000'))  # em caracteres
@@ -71,6 +91,22 @@ class Config:
     
     # --- Configurações de Modelos ---
     class AI:
+        # Exibe as respostas à medida que são geradas (streaming SSE)
+        STREAM_RESPONSES = os.getenv('STREAM_RESPONSES', '1') == '1'
+        
+        # Pool de requisições: chamadas simultâneas e limite de pendências antes de recusar novas
+        MAX_CONCURRENT_REQUESTS = 2
+        MAX_PENDING_REQUESTS = 6
+        
+        # Cache local de respostas (SQLite): validade em segundos, limite de entradas e
+        # similaridade mínima entre perguntas para reaproveitar uma resposta (0 = só idênticas;
+        # a similaridade de texto não distingue antônimos, por isso vem desativada)
+        RESPONSE_CACHE = os.getenv('RESPONSE_CACHE', '1') == '1'
+        RESPONSE_CACHE_PATH = os.path.join(DATA_DIR, 'response_cache.sqlite3')
+        RESPONSE_CACHE_TTL = 6 * 3600
+        RESPONSE_CACHE_MAX_ENTRIES = 2000
+        RESPONSE_CACHE_SIMILARITY = float(os.getenv('RESPONSE_CACHE_SIMILARITY', '0'))
+        
         # Configurações para o modo diário
         DAILY = {
             'endpoint': "https://api.deepseek.com/v1/chat/completions",
@@ -81,7 +117,9 @@ class Config:
                 'system_prompt': (
                     "Você é um assistente pessoal especializado em produtividade. "
                     "Forneça respostas curtas e práticas em português."
-                )
+                ),
+                'context_window': 3,  # turnos anteriores mantidos no histórico
+                'history_tokens': 800  # orçamento estimado de tokens do histórico
             }
         }
         
@@ -96,10 +134,23 @@ class Config:
                     "Você é um assistente técnico especializado em desenvolvimento de software. "
                     "Use markdown para formatação técnica e mantenha o contexto de 5 mensagens."
                 ),
-                'context_window': 5
+                'context_window': 5,
+                'history_tokens': 3000
             }
         }
     
+    # --- Configurações de Rede ---
+    class HTTP:
+        # Pool de conexões keep-alive compartilhado pelos clientes da API
+        POOL_CONNECTIONS = int(os.getenv('HTTP_POOL_CONNECTIONS', '2'))  # hosts distintos em cache
+        POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', '8'))  # conexões simultâneas por host
+        POOL_BLOCK = True  # aguarda conexão livre ao atingir o limite por host
+        
+        # Timeouts em segundos (conexão, leitura entre bytes recebidos)
+        CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', '5'))
+        READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', '120'))
+        MAX_RETRIES = 2  # apenas falhas de conexão
+    
     # --- Configurações de Voz ---
     class Voice:
         # Configurações do Piper
@@ -108,16 +159,60 @@ class Config:
         PIPER_EXECUTABLE = os.path.join(PIPER_DIR, 'piper.exe')  # Windows executable
         PIPER_PATH = PIPER_EXECUTABLE
         PIPER_MODEL = "pt_BR-faber-medium.onnx"
+        NOISE_SCALE = 0.667
+        SENTENCE_SILENCE = 0.5  # segundos de silêncio após cada frase
         
         # Configurações de áudio
         SAMPLE_RATE = 22050
         DEVICE = "default"
         LISTEN_TIMEOUT = 5  # Timeout em segundos para escuta de comandos
+        SPEECH_BACKLOG = 8  # Máximo de falas aguardando na fila
+        
+        # Captura contínua do microfone e segmentação por VAD
+        CAPTURE_BUFFER_SECONDS = 30  # tamanho do buffer circular
+        VAD_MIN_ENERGY = 300  # RMS mínimo (int16) para considerar fala
+        VAD_ENERGY_RATIO = 3.0  # fala = energia acima de N vezes o ruído de fundo
+        VAD_PAUSE_SECONDS = 0.8  # silêncio que encerra uma fala
+        VAD_MAX_UTTERANCE_SECONDS = 15
+        COMMAND_TIMEOUT = 15  # segundos para o comando após a wake word
+        
+        # Reconhecimento de fala: 'google' (nuvem) ou 'vosk' (offline, CPU)
+        STT_BACKEND = os.getenv('STT_BACKEND', 'google')
+        STT_LANGUAGE = "pt-BR"
+        VOSK_MODEL_DIR = os.getenv('VOSK_MODEL_DIR', os.path.join(DATA_DIR, 'models', 'vosk-model-small-pt-0.3'))
+        
+        # Detecção local da palavra de ativação (gravações de referência em WAV)
+        WAKE_WORD_TEMPLATES_DIR = os.path.join(DATA_DIR, 'wake_word')
+        WAKE_WORD_THRESHOLD = float(os.getenv('WAKE_WORD_THRESHOLD', '0.35'))  # distância máxima
+        WAKE_WORD_ENERGY_THRESHOLD = 300  # RMS mínimo (int16) para considerar fala
+        WAKE_WORD_MAX_SECONDS = 2.0  # trecho inicial da fala comparado com as referências
+        
+        # Cache de frases sintetizadas
+        PHRASE_CACHE_DIR = os.path.join(DATA_DIR, 'tts_cache')
+        PHRASE_CACHE_MEMORY_MB = 16
+        PHRASE_CACHE_DISK_MB = 64
+        
+        # Frases fixas sintetizadas antecipadamente na inicialização
+        SYSTEM_PHRASES = [
+            "Carregando arquivos necessários, por favor aguarde",
+            "Sistema inicializado com sucesso, como posso ajudar Senhor?",
+            "Sim, senhor. Como posso ajudar?",
+        ]
     
     # --- Interface do Usuário ---
     class UI:
         THEME = "darkly"
+        # Chat: mensagens mantidas no widget; as anteriores ficam na transcrição em disco
         CHAT_HISTORY_LIMIT = 1000
+        CHAT_PAGE_SIZE = 50  # mensagens carregadas por vez ao rolar até o topo
+        CHAT_TRANSCRIPTS_DIR = os.path.join(DATA_DIR, 'transcripts')
+        CHAT_TRANSCRIPTS_KEPT = 20  # sessões mantidas por aba
+        # Fila de eventos da interface: intervalo de verificação com eventos / máximo quando ociosa
+        BUS_MIN_INTERVAL_MS = 15
+        BUS_MAX_INTERVAL_MS = 200
+        # Editor: espera após a última tecla antes de reanalisar e duração máxima de cada fatia
+        EDITOR_HIGHLIGHT_DELAY_MS = int(os.getenv('EDITOR_HIGHLIGHT_DELAY_MS', 50))
+        EDITOR_HIGHLIGHT_SLICE_MS = 8
         COLORS = {
             'daily': {
                 'primary': "#cc00ff",
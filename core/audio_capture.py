@@ -0,0 +1,228 @@
+# core/audio_capture.py
+import time
+import queue
+import threading
+import logging
+import numpy as np
+import soundfile as sf
+from config import Config
+
+class RingBuffer:
+    """Buffer circular pré-alocado de amostras int16, indexado pela posição absoluta"""
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.data = np.zeros(capacity, dtype=np.int16)
+        self.written = 0  # total de amostras já escritas
+
+    def write(self, samples):
+        """Escreve amostras sem alocar memória (sobrescreve as mais antigas)"""
+        n = len(samples)
+        if n >= self.capacity:
+            samples = samples[-self.capacity:]
+            self.written += n - self.capacity
+            n = self.capacity
+        start = self.written % self.capacity
+        first = min(n, self.capacity - start)
+        self.data[start:start + first] = samples[:first]
+        self.data[:n - first] = samples[first:]
+        self.written += n
+
+    def read(self, start, end):
+        """Copia as amostras [start, end) ainda disponíveis no buffer"""
+        start = max(start, self.written - self.capacity)
+        end = min(end, self.written)
+        if end <= start:
+            return np.zeros(0, dtype=np.int16)
+        a, b = start % self.capacity, end % self.capacity
+        if a < b:
+            return self.data[a:b].copy()
+        return np.concatenate((self.data[a:], self.data[:b]))
+
+class Utterance:
+    """Trecho de fala segmentado pelo VAD"""
+    def __init__(self, samples, sample_rate, start_time, end_time):
+        self.samples = samples
+        self.sample_rate = sample_rate
+        self.start_time = start_time  # time.monotonic() do início da fala
+        self.end_time = end_time
+
+    @property
+    def duration(self):
+        return len(self.samples) / self.sample_rate
+
+class MicrophoneSource:
+    """Captura contínua do microfone via callback do sounddevice"""
+    def __init__(self, sample_rate, block_size, device=None):
+        self.sample_rate = sample_rate
+        self.block_size = block_size
+        self.device = None if device in (None, "default") else device
+        self.stream = None
+
+    def start(self, sink, on_end):
+        import sounddevice as sd
+
+        def callback(indata, frames, time_info, status):
+            sink(indata[:, 0])
+
+        self.stream = sd.InputStream(
+            samplerate=self.sample_rate,
+            blocksize=self.block_size,
+            device=self.device,
+            channels=1,
+            dtype='int16',
+            callback=callback
+        )
+        self.stream.start()
+
+    def stop(self):
+        if self.stream is not None:
+            self.stream.stop()
+            self.stream.close()
+            self.stream = None
+
+class FileSource:
+    """Fonte de áudio a partir de um WAV (testes e diagnósticos sem microfone)"""
+    def __init__(self, path, sample_rate, block_size, realtime=False):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.block_size = block_size
+        self.realtime = realtime
+        self.running = False
+
+    def start(self, sink, on_end):
+        self.running = True
+        threading.Thread(target=self._run, args=(sink, on_end), daemon=True).start()
+
+    def _run(self, sink, on_end):
+        data, rate = sf.read(self.path, dtype='int16', always_2d=True)
+        data = data[:, 0]
+        if rate != self.sample_rate:
+            positions = np.linspace(0, len(data) - 1, int(len(data) * self.sample_rate / rate))
+            data = np.interp(positions, np.arange(len(data)), data).astype(np.int16)
+
+        for start in range(0, len(data), self.block_size):
+            if not self.running:
+                break
+            sink(data[start:start + self.block_size])
+            if self.realtime:
+                time.sleep(self.block_size / self.sample_rate)
+        on_end()
+
+    def stop(self):
+        self.running = False
+
+class AudioCapture:
+    """Captura sem lacunas: a fonte grava no buffer circular e o VAD segmenta em outra thread"""
+    def __init__(self, source=None, sample_rate=16000, frame_ms=30):
+        self.logger = logging.getLogger('voice')
+        self.sample_rate = sample_rate
+        self.frame = int(sample_rate * frame_ms / 1000)
+        self.source = source or MicrophoneSource(sample_rate, self.frame, Config.Voice.DEVICE)
+        self.ring = RingBuffer(int(Config.Voice.CAPTURE_BUFFER_SECONDS * sample_rate))
+        self.segments = queue.Queue()  # Utterance, ou None ao fim da fonte
+
+        # Parâmetros do VAD (em quadros)
+        self.min_energy = Config.Voice.VAD_MIN_ENERGY
+        self.energy_ratio = Config.Voice.VAD_ENERGY_RATIO
+        self.start_frames = 2
+        self.hangover_frames = int(Config.Voice.VAD_PAUSE_SECONDS * 1000 / frame_ms)
+        self.preroll = int(0.3 * sample_rate)
+        self.max_samples = int(Config.Voice.VAD_MAX_UTTERANCE_SECONDS * sample_rate)
+        self.min_samples = int(0.25 * sample_rate)
+        self.noise_floor = None
+
+        self.condition = threading.Condition()
+        self.ended = False
+        self.running = False
+
+    def start(self):
+        """Inicia a fonte e a thread de segmentação"""
+        self.running = True
+        threading.Thread(target=self._segment_loop, daemon=True).start()
+        self.source.start(self._push, self._end_of_stream)
+
+    def stop(self):
+        """Para a captura"""
+        self.running = False
+        self.source.stop()
+        with self.condition:
+            self.condition.notify_all()
+
+    def _push(self, samples):
+        """Chamado pela fonte (thread de áudio): apenas copia para o buffer"""
+        with self.condition:
+            self.ring.write(samples)
+            self.condition.notify()
+
+    def _end_of_stream(self):
+        with self.condition:
+            self.ended = True
+            self.condition.notify()
+
+    def _segment_loop(self):
+        """Aplica o VAD quadro a quadro e publica as falas completas"""
+        position = 0
+        speech_start = None
+        voiced_run = 0
+        silent_run = 0
+
+        while self.running:
+            with self.condition:
+                while self.running and not self.ended and self.ring.written - position < self.frame:
+                    self.condition.wait(0.5)
+                available = self.ring.written
+                ended = self.ended
+
+            # Processamento atrasado demais: descarta o que já foi sobrescrito
+            oldest = available - self.ring.capacity
+            if position < oldest:
+                self.logger.warning("Audio capture overrun, skipping samples")
+                position = oldest
+                speech_start = None
+                voiced_run = silent_run = 0
+
+            while available - position >= self.frame:
+                frame = self.ring.read(position, position + self.frame)
+                position += self.frame
+                voiced = self._is_voiced(frame, speech_start is not None)
+
+                if speech_start is None:
+                    voiced_run = voiced_run + 1 if voiced else 0
+                    if voiced_run >= self.start_frames:
+                        speech_start = max(0, position - voiced_run * self.frame - self.preroll)
+                        silent_run = 0
+                    continue
+
+                silent_run = 0 if voiced else silent_run + 1
+                if silent_run >= self.hangover_frames or position - speech_start >= self.max_samples:
+                    self._emit(speech_start, position, available)
+                    speech_start = None
+                    voiced_run = 0
+
+            if ended:
+                if speech_start is not None:
+                    self._emit(speech_start, position, available)
+                self.segments.put(None)
+                break
+
+    def _is_voiced(self, frame, in_speech):
+        """VAD por energia com piso de ruído adaptativo"""
+        rms = float(np.sqrt(np.mean(frame.astype(np.float32) ** 2)))
+        if self.noise_floor is None:
+            self.noise_floor = rms
+        threshold = max(self.min_energy, self.noise_floor * self.energy_ratio)
+        voiced = rms >= threshold
+        if not voiced and not in_speech:
+            # O piso acompanha o ruído de fundo apenas fora da fala
+            self.noise_floor = 0.95 * self.noise_floor + 0.05 * rms
+        return voiced
+
+    def _emit(self, start, end, available):
+        """Publica uma fala; a posição atual corresponde ao instante da última leitura"""
+        if end - start < self.min_samples:
+            return
+        now = time.monotonic()
+        lag = (available - end) / self.sample_rate
+        end_time = now - lag
+        start_time = end_time - (end - start) / self.sample_rate
+        self.segments.put(Utterance(self.ring.read(start, end), self.sample_rate, start_time, end_time))
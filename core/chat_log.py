@@ -0,0 +1,202 @@
+# core/chat_log.py
+import os
+import json
+import time
+import threading
+import tkinter as tk
+from config import Config
+
+class TranscriptStore:
+    """Transcrição em disco (JSON lines) de uma aba, com índice de offsets para leitura por página"""
+    def __init__(self, path):
+        self.path = path
+        self.offsets = []  # posição em bytes de cada mensagem no arquivo
+        self.size = 0
+        self.lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._build_index()
+
+    @classmethod
+    def for_session(cls, mode, directory=None, keep=None):
+        """Cria a transcrição da sessão atual, removendo as sessões mais antigas da aba"""
+        directory = directory or Config.UI.CHAT_TRANSCRIPTS_DIR
+        keep = Config.UI.CHAT_TRANSCRIPTS_KEPT if keep is None else keep
+        if os.path.isdir(directory):
+            sessions = sorted(name for name in os.listdir(directory)
+                              if name.startswith(f"{mode}-") and name.endswith(".jsonl"))
+            for name in sessions[:max(0, len(sessions) - keep + 1)]:
+                try:
+                    os.remove(os.path.join(directory, name))
+                except OSError:
+                    pass
+        return cls(os.path.join(directory, f"{mode}-{time.strftime('%Y%m%d-%H%M%S')}.jsonl"))
+
+    def _build_index(self):
+        """Indexa as mensagens já gravadas no arquivo"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb') as f:
+            for line in f:
+                self.offsets.append(self.size)
+                self.size += len(line)
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def append(self, sender, message, tag):
+        """Grava uma mensagem e retorna o seu índice"""
+        record = {"sender": sender, "message": message, "tag": tag, "time": time.time()}
+        data = (json.dumps(record, ensure_ascii=False) + "\n").encode('utf-8')
+        with self.lock:
+            with open(self.path, 'ab') as f:
+                f.write(data)
+            self.offsets.append(self.size)
+            self.size += len(data)
+            return len(self.offsets) - 1
+
+    def read(self, start, end):
+        """Lê as mensagens [start, end)"""
+        with self.lock:
+            start, end = max(0, start), min(end, len(self.offsets))
+            if end <= start:
+                return []
+            with open(self.path, 'rb') as f:
+                f.seek(self.offsets[start])
+                return [json.loads(f.readline()) for _ in range(end - start)]
+
+class ChatLog(tk.Text):
+    """Histórico de chat com janela limitada: mensagens antigas ficam só na transcrição em disco
+    e voltam ao widget por páginas quando o usuário rola até o topo"""
+    def __init__(self, master, store, limit=None, page_size=None, **kwargs):
+        kwargs.setdefault('state', 'disabled')
+        super().__init__(master, yscrollcommand=self._on_yscroll, **kwargs)
+        self.store = store
+        self.limit = limit or Config.UI.CHAT_HISTORY_LIMIT
+        self.page_size = page_size or Config.UI.CHAT_PAGE_SIZE
+
+        # Faixa [first, last) da transcrição exibida; cada mensagem começa na marca msg<índice>
+        # (gravidade à direita, para acompanhar inserções no topo)
+        self.first = self.last = len(store)
+        self._open = None  # mensagem em streaming: (remetente, tag, trechos)
+        self._loading = False
+
+    def add_message(self, sender, message, tag):
+        """Exibe e grava uma mensagem completa"""
+        index = self.store.append(sender, message, tag)
+        if self.last != index:
+            self._show_tail()
+            return
+
+        self.config(state=tk.NORMAL)
+        if self._open:
+            # Mensagem em streaming continua sendo a última
+            self.mark_gravity("open_msg", tk.RIGHT)
+            self._insert_message("open_msg", index, sender, message, tag)
+            self.mark_gravity("open_msg", tk.LEFT)
+        else:
+            self._insert_message("end-1c", index, sender, message, tag)
+        self.config(state=tk.DISABLED)
+        self.last = index + 1
+        self._trim()
+        self.see(tk.END)
+
+    def begin_message(self, sender, tag):
+        """Inicia uma mensagem cujo texto chega em trechos"""
+        if self.last != len(self.store):
+            self._show_tail()
+        self._open = (sender, tag, [])
+        self.config(state=tk.NORMAL)
+        self.mark_set("open_msg", "end-1c")
+        self.mark_gravity("open_msg", tk.LEFT)
+        self.insert(tk.END, f"\n{sender}:\n", "bold")
+        self.config(state=tk.DISABLED)
+        self.see(tk.END)
+
+    def append_text(self, text):
+        """Acrescenta um trecho à mensagem em streaming"""
+        self._open[2].append(text)
+        self.config(state=tk.NORMAL)
+        self.insert(tk.END, text, self._open[1])
+        self.config(state=tk.DISABLED)
+        self.see(tk.END)
+
+    def end_message(self):
+        """Conclui a mensagem em streaming e grava na transcrição"""
+        sender, tag, parts = self._open
+        self._open = None
+        index = self.store.append(sender, "".join(parts), tag)
+        self.config(state=tk.NORMAL)
+        self.insert(tk.END, "\n\n", tag)
+        self.config(state=tk.DISABLED)
+        self.mark_set(f"msg{index}", "open_msg")
+        self.mark_unset("open_msg")
+        self.last = index + 1
+        self._trim()
+        self.see(tk.END)
+
+    def _insert_message(self, position, index, sender, message, tag):
+        """Insere uma mensagem na posição e marca o seu início (chamar com o widget editável)"""
+        start = self.index(position)
+        self.insert(position, f"\n{sender}:\n", "bold", f"{message}\n\n", tag)
+        self.mark_set(f"msg{index}", start)
+
+    def _trim(self, keep_top=False):
+        """Mantém no máximo 'limit' mensagens, descartando do lado oposto ao que o usuário lê"""
+        excess = self.last - self.first - self.limit
+        if excess <= 0:
+            return
+        self.config(state=tk.NORMAL)
+        if keep_top:
+            cut = self.last - excess
+            self.delete(f"msg{cut}", "end-1c")
+            self._unset_marks(cut, self.last)
+            self.last = cut
+        else:
+            cut = self.first + excess
+            self.delete("1.0", f"msg{cut}")
+            self._unset_marks(self.first, cut)
+            self.first = cut
+        self.config(state=tk.DISABLED)
+
+    def _unset_marks(self, start, end):
+        for index in range(start, end):
+            self.mark_unset(f"msg{index}")
+
+    def _show_tail(self):
+        """Volta a exibir as últimas mensagens (após o usuário ter paginado para trás)"""
+        self.config(state=tk.NORMAL)
+        self.delete("1.0", tk.END)
+        self._unset_marks(self.first, self.last)
+        self.first = self.last = max(0, len(self.store) - self.limit)
+        for record in self.store.read(self.first, len(self.store)):
+            self._insert_message("end-1c", self.last, record["sender"], record["message"], record["tag"])
+            self.last += 1
+        self.config(state=tk.DISABLED)
+        self.see(tk.END)
+
+    def _on_yscroll(self, first, last):
+        """Topo alcançado: carrega a página anterior da transcrição"""
+        # Durante o streaming a janela não pagina: o corte teria de remover a página carregada
+        # (a mensagem aberta fica no fim), e o topo voltaria a pedir a mesma página
+        if float(first) <= 0.0 and self.first > 0 and not self._loading and not self._open:
+            self._loading = True
+            self.after_idle(self._load_older)
+
+    def _load_older(self):
+        """Insere no topo as mensagens anteriores, mantendo a posição de leitura"""
+        self._loading = False
+        if self._open:
+            return
+        start = max(0, self.first - self.page_size)
+        records = self.store.read(start, self.first)
+        if not records:
+            return
+        anchor = f"msg{self.first}"
+
+        self.config(state=tk.NORMAL)
+        for offset, record in reversed(list(enumerate(records))):
+            self._insert_message("1.0", start + offset, record["sender"], record["message"], record["tag"])
+        self.config(state=tk.DISABLED)
+        self.first = start
+        self.yview(anchor)
+        self._trim(keep_top=True)
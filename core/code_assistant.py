@@ -1,16 +1,24 @@
 # code_assistant.py
-import requests
 from config import Config
+from core.http_client import get_transport
+from core.conversation import ConversationMemory
+from core.payload_builder import PayloadBuilder, UsageStats
 from tenacity import retry, stop_after_attempt, wait_exponential
 
 class AegisCognitiveCore:
-    def __init__(self):
+    def __init__(self, transport=None):
+        self.transport = transport or get_transport()
         self.api_url = "https://api.deepseek.com/chat/completions"
         self.headers = {
             "Authorization": f"Bearer {Config.DEEPSEEK_API_KEY}",
             "Content-Type": "application/json"
         }
-        self.history = []
+        params = Config.AI.DEVELOPER['params']
+        self.max_tokens = params['max_tokens']
+        self.history = ConversationMemory(
+            token_budget=params.get('history_tokens', 3000),
+            max_turns=params.get('context_window')
+        )
         self.r1_instructions = (
             "Você é o A.E.G.I.S, assistente de IA especializado em desenvolvimento de software e produtividade, inspirado no jarvis do homem de ferro. "
             "Forneça respostas técnicas, concisas e diretas. Priorize: "
@@ -19,33 +27,33 @@ class AegisCognitiveCore:
             "3. Referências a documentações oficiais\n"
             "evite o uso de caracteres especiais, a não ser que seja um código."
         )
+        self.builder = PayloadBuilder(
+            "deepseek-reasoner",  # Nome exato do modelo R1
+            self.r1_instructions,
+            {
+                "temperature": 0.2,
+                "max_tokens": self.max_tokens,
+                "top_p": 0.95,
+                "presence_penalty": 0.5
+            }
+        )
+        self.usage = UsageStats()
 
     @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10))
     def generate_response(self, prompt, context=""):
         """Gera respostas usando o DeepSeek-R1 com foco técnico"""
         try:
-            # Contexto aumentado para R1
-            full_prompt = f"[[CONTEXTO]]\n{context}\n\n[[SOLICITAÇÃO]]\n{prompt}"
-            
-            self.history.append({"role": "user", "content": full_prompt})
-            
-            payload = {
-                "model": "deepseek-reasoner",  # Nome exato do modelo R1
-                "messages": [
-                    {"role": "system", "content": self.r1_instructions},
-                    *self.history[-Config.MAX_HISTORY_LENGTH:]
-                ],
-                "temperature": 0.2,
-                "max_tokens": Config.MAX_RESPONSE_TOKENS,
-                "top_p": 0.95,
-                "presence_penalty": 0.5
-            }
+            # O contexto fica fixado junto às instruções e a solicitação vai por último,
+            # mantendo o prefixo da requisição idêntico entre perguntas sobre o mesmo código
+            payload = self.builder.build(prompt, self.history.messages(), pinned_context=context)
 
-            response = requests.post(self.api_url, headers=self.headers, json=payload)
+            response = self.transport.post(self.api_url, headers=self.headers, json=payload)
             response.raise_for_status()
             
-            content = response.json()['choices'][0]['message']['content']
-            self.history.append({"role": "assistant", "content": content})
+            data = response.json()
+            self.usage.record(data.get('usage'))
+            content = data['choices'][0]['message']['content']
+            self.history.add_turn(prompt, content)
             
             return self._r1_postprocessing(content)
             
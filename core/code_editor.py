@@ -1,12 +1,23 @@
 # code_editor.py
+import time
 import tkinter as tk
 from tkinter import font
-from pygments import lex
+from pygments.lexer import ExtendedRegexLexer, LexerContext
 from pygments.lexers import PythonLexer
+from config import Config
+
+# Tags de destaque; cada token usa a tag do seu tipo mais específico (String antes de Literal)
+HIGHLIGHT_TAGS = ("Keyword", "Name", "Literal", "Comment", "String")
+
+# Linhas acima da área visível buscadas por um estado conhecido no destaque provisório
+VIEWPORT_LOOKBEHIND = 100
+
+class StatefulPythonLexer(ExtendedRegexLexer, PythonLexer):
+    """PythonLexer que expõe a pilha de estados (ctx.stack) durante a análise"""
 
 class CodeEditor(tk.Text):
     """Cyberpunk purple code matrix"""
-    def __init__(self, master, **kwargs):
+    def __init__(self, master, highlight_delay=None, **kwargs):
         self.colors = {
             "bg": "#1a0a33",
             "fg": "#e6b3ff",
@@ -21,8 +32,30 @@ class CodeEditor(tk.Text):
             'insertbackground': self.colors["accent"],
             'selectbackground': '#4d0066'
         })
-        super().__init__(master, **kwargs)
-        self.lexer = PythonLexer()
+        self._yscroll_target = kwargs.pop('yscrollcommand', None)
+        super().__init__(master, yscrollcommand=self._on_yscroll, **kwargs)
+        self.lexer = StatefulPythonLexer()
+        self._token_tags = {}
+        
+        # Estado do lexer no início de cada linha (None = desconhecido) e faixa de linhas editadas
+        self._line_states = [("root",)]
+        self._dirty = None
+        self._install_edit_proxy()
+        
+        # Agendamento do destaque: espera de agrupamento (ms) e duração de cada fatia (ms)
+        self.highlight_delay = Config.UI.EDITOR_HIGHLIGHT_DELAY_MS if highlight_delay is None else highlight_delay
+        self.highlight_slice = Config.UI.EDITOR_HIGHLIGHT_SLICE_MS
+        self._highlight_after = None
+        self._highlight_slice = None
+        self._highlight_job = None
+        self._job_range = None
+        
+        # Gutter: itens de texto reaproveitados, (texto, y) exibidos em cada um e a última vista desenhada
+        self._gutter_items = []
+        self._gutter_slots = []
+        self._gutter_view = None
+        self._yscroll_fractions = None
+        
         self._create_line_display()
         self._configure_tags()
         self._bind_events()
@@ -53,33 +86,297 @@ class CodeEditor(tk.Text):
     def _on_key_action(self, event=None):
         """Update display on key release"""
         self._update_lines()
-        self._highlight_code()
+        self._schedule_highlight()
+
+    def _install_edit_proxy(self):
+        """Intercepta insert/delete no comando Tcl do widget para rastrear as linhas editadas"""
+        self._orig_command = self._w + "_orig"
+        self.tk.call("rename", self._w, self._orig_command)
+        self.tk.createcommand(self._w, self._proxy)
+
+    def _proxy(self, *args):
+        """Repassa o comando ao widget original registrando edições"""
+        if args and args[0] in ("insert", "delete", "replace"):
+            self._track_edit(args[0], args[1:])
+        return self.tk.call((self._orig_command,) + args)
+
+    def _line_of(self, index):
+        """Linha de um índice; 'end' equivale à última linha, como o próprio Tk trata edições"""
+        line = int(self.tk.call(self._orig_command, "index", index).split(".")[0])
+        return min(line, int(self.tk.call(self._orig_command, "index", "end-1c").split(".")[0]))
+
+    def _track_edit(self, command, args):
+        """Atualiza os estados por linha e a faixa suja antes da edição ser aplicada"""
+        # A análise em andamento usa o texto anterior à edição
+        self._cancel_highlight_job()
+        if command in ("delete", "replace"):
+            first = self._line_of(args[0])
+            last = self._line_of(args[1] if len(args) > 1 else f"{args[0]} + 1c")
+            removed = max(0, last - first)
+            del self._line_states[first:first + removed]
+            self._mark_dirty(first, first, lambda line: line if line <= first else max(first, line - removed))
+            
+        if command in ("insert", "replace"):
+            index, chunks = (args[0], args[1::2]) if command == "insert" else (args[0], args[2::2])
+            line = self._line_of(index)
+            added = sum(chunk.count("\n") for chunk in chunks)
+            self._line_states[line:line] = [None] * added
+            self._mark_dirty(line, line + added, lambda l: l + added if l > line else l)
+
+    def _mark_dirty(self, first, last, shift):
+        """Expande a faixa suja, deslocando a anterior conforme as linhas inseridas/removidas"""
+        if self._dirty is None:
+            self._dirty = (first, last)
+        else:
+            start, end = self._dirty
+            self._dirty = (min(shift(start), first), max(shift(end), last))
+
+    def _tag_for(self, token):
+        """Tag de destaque para um tipo de token ('' se não houver)"""
+        tag = self._token_tags.get(token)
+        if tag is None:
+            current = token
+            while current and current[-1] not in HIGHLIGHT_TAGS:
+                current = current.parent
+            tag = self._token_tags[token] = current[-1] if current else ""
+        return tag
+
+    def _schedule_highlight(self, delay=None):
+        """Agrupa edições: o destaque roda após 'delay' ms sem novas edições"""
+        if self._highlight_after is not None:
+            self.after_cancel(self._highlight_after)
+        delay = self.highlight_delay if delay is None else delay
+        self._highlight_after = self.after(delay, self._start_highlight)
+
+    def _start_highlight(self):
+        """Colore primeiro a área visível e reanalisa o restante em fatias ociosas"""
+        self._highlight_after = None
+        if self._dirty is None:
+            return
+        first, last = self._dirty
+        self._dirty = None
+        self._highlight_viewport(first, last)
+        self._highlight_job = self._highlight_lines(first, last)
+        self._run_highlight_job()
+
+    def _run_highlight_job(self):
+        """Executa uma fatia da análise e agenda a próxima, devolvendo o controle ao Tk"""
+        self._highlight_slice = None
+        if self._highlight_job is None:
+            return
+        try:
+            next(self._highlight_job)
+        except StopIteration:
+            self._highlight_job = None
+            return
+        self._highlight_slice = self.after(1, self._run_highlight_job)
+
+    def _cancel_highlight_job(self):
+        """Interrompe a análise em andamento; as linhas restantes voltam para a faixa suja"""
+        if self._highlight_job is None:
+            return
+        self._highlight_job = None
+        if self._highlight_slice is not None:
+            self.after_cancel(self._highlight_slice)
+            self._highlight_slice = None
+        first, last = self._job_range
+        self._mark_dirty(first, max(first, last), lambda line: line)
+        self._schedule_highlight()
 
     def _highlight_code(self):
-        """Syntax highlighting"""
-        self.mark_set("range_start", "1.0")
-        code = self.get("1.0", "end-1c")
+        """Syntax highlighting incremental imediato (sem fatiamento)"""
+        self._cancel_highlight_job()
+        if self._highlight_after is not None:
+            self.after_cancel(self._highlight_after)
+            self._highlight_after = None
+        if self._dirty is None:
+            return
+        first, last = self._dirty
+        self._dirty = None
+        for _ in self._highlight_lines(first, last, budget=None):
+            pass
+
+    def _highlight_lines(self, first, last, budget=0):
+        """Gerador: reanalisa a partir da primeira linha editada até os estados voltarem a coincidir.
+        
+        Pausa (yield) a cada 'budget' segundos, sempre num início de linha seguro;
+        as tags de cada fatia são aplicadas antes da pausa.
+        """
+        if budget == 0:
+            budget = self.highlight_slice / 1000
+            
+        line_count = int(self.index("end-1c").split(".")[0])
+        if len(self._line_states) != line_count:
+            # Controle perdido (ex.: edição fora do proxy): reanalisa tudo
+            self._line_states = [("root",)] + [None] * (line_count - 1)
+            first, last = 1, line_count
+            
+        # Recua até a última linha com estado conhecido
+        first = max(1, min(first, line_count))
+        while self._line_states[first - 1] is None:
+            first -= 1
+        self._job_range = (first, last)
+            
+        text = self.get(f"{first}.0", "end-1c")
+        ctx = LexerContext(text, 0, stack=list(self._line_states[first - 1]))
+        ranges = {tag: [] for tag in HIGHLIGHT_TAGS}
+        deadline = time.perf_counter() + budget if budget else None
+        
+        line, line_offset, batch_start = first, 0, first
+        next_line = text.find("\n") + 1 or len(text) + 1
+        stop_line = None
+        for pos, token, value in self.lexer.get_tokens_unprocessed(context=ctx):
+            while pos >= next_line:
+                line += 1
+                line_offset = next_line
+                next_line = text.find("\n", line_offset) + 1 or len(text) + 1
+                
+                # Linha iniciada no meio de um token (ex.: docstring) não serve de ponto de reinício
+                state = tuple(ctx.stack) if pos == line_offset else None
+                
+                # Depois da edição, mesmo estado no início da linha = restante inalterado
+                if line > last and state is not None and self._line_states[line - 1] == state:
+                    stop_line = line
+                    break
+                self._line_states[line - 1] = state
+                
+                if deadline and state is not None and time.perf_counter() >= deadline:
+                    self._apply_tags(ranges, batch_start, f"{line}.0")
+                    ranges = {tag: [] for tag in HIGHLIGHT_TAGS}
+                    batch_start = line
+                    self._job_range = (line, last)
+                    yield
+                    deadline = time.perf_counter() + budget
+            if stop_line is not None:
+                break
+                
+            tag = self._tag_for(token)
+            if not tag:
+                continue
+            newlines = value.count("\n")
+            end_col = len(value) - value.rfind("\n") - 1 if newlines else pos - line_offset + len(value)
+            ranges[tag].extend((f"{line}.{pos - line_offset}", f"{line + newlines}.{end_col}"))
+            
+        self._apply_tags(ranges, batch_start, f"{stop_line}.0" if stop_line is not None else "end")
+
+    def _highlight_viewport(self, first, last):
+        """Destaque provisório das linhas visíveis a partir dos estados conhecidos.
+        
+        Só é usado quando a faixa suja começa bem acima da tela (ex.: colar um bloco
+        grande ou abrir um arquivo rolado); a análise sequencial corrige depois.
+        """
+        top = int(self.index("@0,0").split(".")[0])
+        bottom = int(self.index(f"@0,{self.winfo_height()}").split(".")[0])
+        if first >= top - VIEWPORT_LOOKBEHIND or first > bottom:
+            return
+        
+        start = top
+        while start > top - VIEWPORT_LOOKBEHIND and start > 1 and (
+                start > len(self._line_states) or self._line_states[start - 1] is None):
+            start -= 1
+        if start > len(self._line_states) or self._line_states[start - 1] is None:
+            return
+            
+        text = self.get(f"{start}.0", f"{bottom + 1}.0")
+        ctx = LexerContext(text, 0, stack=list(self._line_states[start - 1]))
+        ranges = {tag: [] for tag in HIGHLIGHT_TAGS}
+        line, line_offset = start, 0
+        next_line = text.find("\n") + 1 or len(text) + 1
+        for pos, token, value in self.lexer.get_tokens_unprocessed(context=ctx):
+            while pos >= next_line:
+                line += 1
+                line_offset = next_line
+                next_line = text.find("\n", line_offset) + 1 or len(text) + 1
+            tag = self._tag_for(token)
+            if not tag:
+                continue
+            newlines = value.count("\n")
+            end_col = len(value) - value.rfind("\n") - 1 if newlines else pos - line_offset + len(value)
+            ranges[tag].extend((f"{line}.{pos - line_offset}", f"{line + newlines}.{end_col}"))
+        self._apply_tags(ranges, start, f"{bottom + 1}.0")
+
+    def _apply_tags(self, ranges, first, end):
+        """Remove as tags antigas na faixa [first, end) e aplica as novas em lote"""
+        for tag, indices in ranges.items():
+            self.tag_remove(tag, f"{first}.0", end)
+            if indices:
+                self.tag_add(tag, *indices)
+
+    def rehighlight(self):
+        """Reanalisa o documento inteiro"""
+        self._cancel_highlight_job()
+        line_count = int(self.index("end-1c").split(".")[0])
+        self._line_states = [("root",)] + [None] * (line_count - 1)
+        self._dirty = (1, line_count)
+        self._schedule_highlight(0)
+
+    def configure(self, cnf=None, **kwargs):
+        """Preserva o yscrollcommand interno; o informado é chamado em seguida (ex.: Scrollbar.set)"""
+        if 'yscrollcommand' in kwargs:
+            self._yscroll_target = kwargs.pop('yscrollcommand')
+            if cnf is None and not kwargs:
+                return None
+        return super().configure(cnf, **kwargs)
+    config = configure
+
+    def _on_yscroll(self, first, last):
+        """Rolagem ou mudança na altura do documento: redesenha o gutter"""
+        if self._yscroll_target:
+            self._yscroll_target(first, last)
+        if (first, last) != self._yscroll_fractions:
+            self._yscroll_fractions = (first, last)
+            self._update_lines(force=True)
+
+    def _update_lines(self, event=None, force=False):
+        """Update line numbers, reusing the canvas items of the gutter"""
+        first = self.index("@0,0")
+        top = self.dlineinfo(first)
+        # A última linha visível acusa quebras de linha (wrap) que surgem ou somem acima dela,
+        # mesmo sem rolagem (documento menor que a janela)
+        bottom = self.index(f"@0,{self.winfo_height()}")
+        end = self.dlineinfo(bottom)
+        view = (
+            first, top[1] if top else None,
+            bottom, end[1] if end else None,
+            self.index("end-1c").split(".")[0], self.winfo_height()
+        )
+        if view == self._gutter_view and not force:
+            return
+        self._gutter_view = view
         
-        for token, content in lex(code, self.lexer):
-            self.mark_set("range_end", f"range_start + {len(content)}c")
-            self.tag_add(str(token), "range_start", "range_end")
-            self.mark_set("range_start", "range_end")
-
-    def _update_lines(self, event=None):
-        """Update line numbers"""
-        self.line_canvas.delete("all")
-        i = self.index("@0,0")
+        slot, i = 0, first
         while True:
             dline = self.dlineinfo(i)
             if not dline: break
-            y = dline[1]
-            line_num = str(i).split(".")[0]
-            self.line_canvas.create_text(45, y,
-                text=f"» {line_num}",
+            self._set_gutter_slot(slot, f"» {str(i).split('.')[0]}", dline[1])
+            slot += 1
+            i = self.index(f"{i}+1line")
+        for extra in range(slot, len(self._gutter_items)):
+            self._set_gutter_slot(extra, None, None)
+
+    def _set_gutter_slot(self, slot, text, y):
+        """Altera um item do gutter apenas se o texto ou a posição mudaram (text=None oculta)"""
+        if slot == len(self._gutter_items):
+            self._gutter_items.append(self.line_canvas.create_text(45, y,
+                text=text,
                 fill=self.colors["line_fg"],
                 font=("OCR A Extended", 10)
-            )
-            i = self.index(f"{i}+1line")
+            ))
+            self._gutter_slots.append((text, y))
+            return
+        
+        current_text, current_y = self._gutter_slots[slot]
+        if (text, y) == (current_text, current_y):
+            return
+        item = self._gutter_items[slot]
+        if text is None:
+            self.line_canvas.itemconfigure(item, state="hidden")
+        else:
+            if text != current_text or current_text is None:
+                self.line_canvas.itemconfigure(item, text=text, state="normal")
+            if y != current_y:
+                self.line_canvas.coords(item, 45, y)
+        self._gutter_slots[slot] = (text, y)
 
     def set_initial_content(self):
         """Default content"""
@@ -89,5 +386,5 @@ class CodeEditor(tk.Text):
         """Programmatically set text"""
         self.delete(1.0, tk.END)
         self.insert(tk.END, text)
-        self._highlight_code()
+        self._schedule_highlight(0)
         self._update_lines()
\ No newline at end of file
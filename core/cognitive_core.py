@@ -1,38 +1,265 @@
 # core/cognitive_core.py
-import requests
+import json
+import asyncio
 from config import Config
+from core.http_client import get_transport, abort_response, AsyncHTTPTransport
+from core.conversation import ConversationMemory
+from core.payload_builder import PayloadBuilder, UsageStats
+from core.response_cache import ResponseCache
+
+# Parâmetros de configuração que não fazem parte do corpo da requisição
+LOCAL_PARAMS = ('system_prompt', 'context_window', 'history_tokens')
+
+# Marca o fim do fluxo SSE
+STREAM_DONE = object()
+
+def parse_stream_line(line):
+    """Interpreta uma linha SSE: evento (dict), None (sem dados) ou STREAM_DONE"""
+    # Linhas vazias separam eventos; comentários SSE (keep-alive) começam com ':'
+    if not line or not line.startswith("data:"):
+        return None
+    data = line[5:].strip()
+    if data == "[DONE]":
+        return STREAM_DONE
+    return json.loads(data)
+
+def stream_content(event):
+    """Trecho de texto de um evento do streaming (None se não houver)"""
+    choices = event.get('choices') or []
+    if not choices:
+        return None
+    # O deepseek-reasoner também envia 'reasoning_content', que não é exibido
+    return choices[0].get('delta', {}).get('content') or None
+
+def _cancelled(cancel_token):
+    return cancel_token is not None and cancel_token.cancelled
+
+def _abort_on_cancel(cancel_token, response):
+    """Fecha a resposta ao cancelar; retorna a função que desfaz o registro"""
+    if cancel_token is None:
+        return lambda: None
+    return cancel_token.on_cancel(lambda: abort_response(response))
 
 class CognitiveCore:
-    def __init__(self):
+    def __init__(self, transport=None, cache=None):
+        self.transport = transport or get_transport()
+        self.cache = cache or (ResponseCache() if Config.AI.RESPONSE_CACHE else None)
         self.headers = {
             "Authorization": f"Bearer {Config.DEEPSEEK_API_KEY}",  # Chave única
             "Content-Type": "application/json"
         }
+        self.memories = {}  # histórico por modo
+        self.builders = {}
+        self.pinned = {}  # contexto fixado por modo (ex.: código em edição)
+        self.usage = UsageStats()
 
-    def _call_api(self, mode, payload):
-        """Chamada unificada para a API"""
-        endpoint = Config.AI.DAILY['endpoint'] if mode == 'daily' else Config.AI.DEVELOPER['endpoint']
+    def _config(self, mode):
+        return Config.AI.DAILY if mode == 'daily' else Config.AI.DEVELOPER
+
+    def memory(self, mode):
+        """Histórico de conversa do modo, limitado pelo orçamento de tokens da configuração"""
+        if mode not in self.memories:
+            params = self._config(mode)['params']
+            self.memories[mode] = ConversationMemory(
+                token_budget=params.get('history_tokens', 1500),
+                max_turns=params.get('context_window')
+            )
+        return self.memories[mode]
+
+    def _endpoint(self, mode):
+        return self._config(mode)['endpoint']
+
+    def _builder(self, mode):
+        if mode not in self.builders:
+            config = self._config(mode)
+            self.builders[mode] = PayloadBuilder(
+                config['model'],
+                config['params']['system_prompt'],
+                {k: v for k, v in config['params'].items() if k not in LOCAL_PARAMS}
+            )
+        return self.builders[mode]
+
+    def pin_context(self, mode, context):
+        """Fixa um contexto enviado logo após as instruções em todas as requisições do modo"""
+        self.pinned[mode] = context or None
+
+    def _call_api(self, mode, payload, cancel_token=None):
+        """Chamada unificada para a API; retorna None se cancelada pelo cancel_token"""
+        # Com cancelamento, o corpo é lido depois dos cabeçalhos para que a conexão possa ser
+        # fechada durante a espera (a API envia linhas em branco enquanto gera a resposta)
+        with self.transport.post(
+            self._endpoint(mode),
+            headers=self.headers,
+            json=payload,
+            stream=cancel_token is not None
+        ) as response:
+            # A conexão volta ao pool ao sair: depois disso o cancelamento não pode mais fechá-la
+            release = _abort_on_cancel(cancel_token, response)
+            try:
+                response.raise_for_status()
+                data = response.json()
+            except Exception:
+                if _cancelled(cancel_token):
+                    return None
+                raise
+            finally:
+                release()
+        if _cancelled(cancel_token):
+            return None
+        self.usage.record(data.get('usage'))
+        return data['choices'][0]['message']['content']
+
+    def _stream_api(self, mode, payload, cancel_token=None):
+        """Chamada em streaming: produz os trechos de texto à medida que chegam (SSE)"""
+        with self.transport.post(
+            self._endpoint(mode),
+            headers=self.headers,
+            json=payload,
+            stream=True
+        ) as response:
+            # Cancelar fecha a conexão, inclusive durante o raciocínio do deepseek-reasoner
+            # (eventos só com 'reasoning_content') ou entre keep-alives
+            release = _abort_on_cancel(cancel_token, response)
+            # text/event-stream sem charset: o requests assumiria ISO-8859-1 (o SSE é sempre UTF-8)
+            response.encoding = "utf-8"
+            try:
+                response.raise_for_status()
+                for line in response.iter_lines(decode_unicode=True):
+                    if _cancelled(cancel_token):
+                        return
+                    event = parse_stream_line(line)
+                    if event is STREAM_DONE:
+                        break
+                    if event is None:
+                        continue
+                    self.usage.record(event.get('usage'))
+                    content = stream_content(event)
+                    if content:
+                        yield content
+            except Exception:
+                if _cancelled(cancel_token):
+                    return
+                raise
+            finally:
+                release()
+
+    def _build_payload(self, query, mode, stream=False):
+        """Monta o corpo da requisição: prefixo estável (instruções, contexto, histórico) e a pergunta por último"""
+        return self._builder(mode).build(
+            query,
+            self.memory(mode).messages(),
+            pinned_context=self.pinned.get(mode),
+            stream=stream
+        )
+
+    def _cached(self, mode, payload):
+        return self.cache.get(mode, payload) if self.cache else None
+
+    def _remember(self, query, mode, payload, response, cached=False):
+        """Registra a troca no histórico e a resposta nova no cache"""
+        self.memory(mode).add_turn(query, response)
+        if self.cache and not cached:
+            self.cache.put(mode, payload, response)
+
+    def generate_response(self, query, mode, cancel_token=None):
+        """Gera resposta para o modo especificado (None se cancelada pelo cancel_token)"""
+        payload = self._build_payload(query, mode)
+        response = self._cached(mode, payload)
+        if response is not None:
+            self._remember(query, mode, payload, response, cached=True)
+            return response
+        response = self._call_api(mode, payload, cancel_token)
+        if response is None:
+            return None
+        self._remember(query, mode, payload, response)
+        return response
+
+    def stream_response(self, query, mode, cancel_token=None):
+        """Gera resposta em streaming (gerador de trechos de texto); termina cedo se cancelada"""
+        payload = self._build_payload(query, mode, stream=True)
+        response = self._cached(mode, payload)
+        if response is not None:
+            yield response
+            self._remember(query, mode, payload, response, cached=True)
+            return
         
-        response = requests.post(
-            endpoint,
+        parts = []
+        for chunk in self._stream_api(mode, payload, cancel_token):
+            parts.append(chunk)
+            yield chunk
+        # Só entram no histórico e no cache as respostas recebidas por completo
+        if not _cancelled(cancel_token):
+            self._remember(query, mode, payload, "".join(parts))
+
+class AsyncCognitiveCore(CognitiveCore):
+    """Variante assíncrona (asyncio) para a interface Textual.
+
+    Não bloqueia o loop de eventos; requisições simultâneas compartilham o pool do
+    cliente assíncrono e se sobrepõem. Cancelar a tarefa encerra a conexão do streaming.
+    """
+    def __init__(self, transport=None, cache=None):
+        super().__init__(transport=transport or AsyncHTTPTransport(), cache=cache)
+
+    async def _call_api(self, mode, payload):
+        """Chamada unificada para a API"""
+        response = await self.transport.post(
+            self._endpoint(mode),
             headers=self.headers,
             json=payload
         )
         response.raise_for_status()
-        return response.json()['choices'][0]['message']['content']
+        data = response.json()
+        self.usage.record(data.get('usage'))
+        return data['choices'][0]['message']['content']
 
-    def generate_response(self, query, mode):
+    async def _stream_api(self, mode, payload):
+        """Chamada em streaming: iterador assíncrono dos trechos de texto (SSE)"""
+        async with self.transport.stream(
+            "POST",
+            self._endpoint(mode),
+            headers=self.headers,
+            json=payload
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                event = parse_stream_line(line)
+                if event is STREAM_DONE:
+                    break
+                if event is None:
+                    continue
+                self.usage.record(event.get('usage'))
+                content = stream_content(event)
+                if content:
+                    yield content
+
+    # O cache de respostas faz E/S no SQLite: roda numa thread, fora do loop de eventos
+
+    async def generate_response(self, query, mode):
         """Gera resposta para o modo especificado"""
-        config = Config.AI.DAILY if mode == 'daily' else Config.AI.DEVELOPER
-        payload = {
-            "model": config['model'],
-            "messages": [{
-                "role": "system",
-                "content": config['params']['system_prompt']
-            }, {
-                "role": "user", 
-                "content": query
-            }],
-            **config['params']
-        }
-        return self._call_api(mode, payload)
\ No newline at end of file
+        payload = self._build_payload(query, mode)
+        response = await asyncio.to_thread(self._cached, mode, payload)
+        if response is not None:
+            await asyncio.to_thread(self._remember, query, mode, payload, response, True)
+            return response
+        response = await self._call_api(mode, payload)
+        await asyncio.to_thread(self._remember, query, mode, payload, response)
+        return response
+
+    async def stream_response(self, query, mode):
+        """Gera resposta em streaming (iterador assíncrono de trechos de texto)"""
+        payload = self._build_payload(query, mode, stream=True)
+        response = await asyncio.to_thread(self._cached, mode, payload)
+        if response is not None:
+            yield response
+            await asyncio.to_thread(self._remember, query, mode, payload, response, True)
+            return
+        
+        parts = []
+        async for chunk in self._stream_api(mode, payload):
+            parts.append(chunk)
+            yield chunk
+        await asyncio.to_thread(self._remember, query, mode, payload, "".join(parts))
+
+    async def aclose(self):
+        """Fecha as conexões do cliente assíncrono"""
+        await self.transport.aclose()
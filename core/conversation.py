@@ -0,0 +1,74 @@
+# core/conversation.py
+import re
+import threading
+from collections import deque
+
+def estimate_tokens(text):
+    """Estimativa barata de tokens (~4 caracteres por token, mais o custo fixo da mensagem)"""
+    return len(text) // 4 + 4
+
+class ConversationMemory:
+    """Histórico de uma conversa limitado por tokens estimados.
+
+    Os turnos mais antigos saem da janela quando o orçamento ou o limite de turnos é
+    excedido; cada turno descartado deixa uma linha num resumo extrativo, também limitado.
+    """
+    def __init__(self, token_budget=1500, max_turns=None, summary_budget=None):
+        self.token_budget = token_budget
+        self.max_turns = max_turns
+        self.summary_budget = token_budget // 5 if summary_budget is None else summary_budget
+        self.turns = deque()  # (pergunta, resposta, tokens estimados)
+        self.summary = deque()  # (linha, tokens estimados)
+        self.tokens = 0
+        self.summary_tokens = 0
+        self.lock = threading.Lock()
+
+    def add_turn(self, user, assistant):
+        """Registra uma troca concluída e aplica os limites"""
+        tokens = estimate_tokens(user) + estimate_tokens(assistant)
+        with self.lock:
+            self.turns.append((user, assistant, tokens))
+            self.tokens += tokens
+            while self.turns and (
+                    self.tokens > self.token_budget or
+                    (self.max_turns is not None and len(self.turns) > self.max_turns)):
+                old_user, old_assistant, old_tokens = self.turns.popleft()
+                self.tokens -= old_tokens
+                self._summarize(old_user, old_assistant)
+
+    def messages(self):
+        """Mensagens a enviar antes da pergunta atual (resumo + turnos recentes)"""
+        with self.lock:
+            messages = []
+            if self.summary:
+                messages.append({
+                    "role": "system",
+                    "content": "Resumo da conversa anterior:\n" + "\n".join(line for line, _ in self.summary)
+                })
+            for user, assistant, _ in self.turns:
+                messages.append({"role": "user", "content": user})
+                messages.append({"role": "assistant", "content": assistant})
+            return messages
+
+    def clear(self):
+        """Esquece toda a conversa"""
+        with self.lock:
+            self.turns.clear()
+            self.summary.clear()
+            self.tokens = self.summary_tokens = 0
+
+    def _summarize(self, user, assistant):
+        """Resume um turno descartado pela primeira frase de cada lado (chamar com lock)"""
+        line = f"- Usuário: {self._first_sentence(user)} | A.E.G.I.S.: {self._first_sentence(assistant)}"
+        tokens = estimate_tokens(line)
+        self.summary.append((line, tokens))
+        self.summary_tokens += tokens
+        while self.summary and self.summary_tokens > self.summary_budget:
+            _, old_tokens = self.summary.popleft()
+            self.summary_tokens -= old_tokens
+
+    @staticmethod
+    def _first_sentence(text, limit=120):
+        text = " ".join(text.split())
+        sentence = re.split(r'(?<=[.!?])\s', text, maxsplit=1)[0]
+        return sentence if len(sentence) <= limit else sentence[:limit - 3] + "..."
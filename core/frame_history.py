@@ -0,0 +1,69 @@
+# core/frame_history.py
+import io
+import bisect
+import threading
+import time
+from collections import deque
+from PIL import Image, features
+from config import Config
+
+class FrameHistory:
+    """Histórico recente da tela: quadros reduzidos e comprimidos num buffer circular limitado em bytes"""
+    def __init__(self, max_bytes=None, max_width=None, max_frames=None, quality=60):
+        self.max_bytes = max_bytes or Config.SCREEN_HISTORY_BYTES
+        self.max_width = max_width or Config.SCREEN_HISTORY_MAX_WIDTH
+        self.max_frames = max_frames or Config.SCREEN_HISTORY_MAX_FRAMES
+        self.quality = quality
+        self.format = "WEBP" if features.check("webp") else "PNG"
+        self.entries = deque()  # (timestamp, bytes comprimidos)
+        self.timestamps = deque()
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+
+    def add(self, frame):
+        """Armazena um ScreenFrame (pode ser usado como assinante do ScreenMonitor)"""
+        image = frame.image
+        if image.width > self.max_width:
+            factor = -(-image.width // self.max_width)
+            image = image.reduce(factor)
+
+        buffer = io.BytesIO()
+        if self.format == "WEBP":
+            image.save(buffer, "WEBP", quality=self.quality, method=0)
+        else:
+            image.convert("P", palette=Image.ADAPTIVE).save(buffer, "PNG", optimize=False)
+        blob = buffer.getvalue()
+        if len(blob) > self.max_bytes:
+            return
+
+        with self.lock:
+            self.entries.append((frame.timestamp, blob))
+            self.timestamps.append(frame.timestamp)
+            self.total_bytes += len(blob)
+            while self.total_bytes > self.max_bytes or len(self.entries) > self.max_frames:
+                _, old = self.entries.popleft()
+                self.timestamps.popleft()
+                self.total_bytes -= len(old)
+
+    def at(self, timestamp):
+        """Imagem exibida no instante (último quadro capturado até ele) ou None"""
+        with self.lock:
+            index = bisect.bisect_right(self.timestamps, timestamp) - 1
+            if index < 0:
+                return None
+            _, blob = self.entries[index]
+        return Image.open(io.BytesIO(blob))
+
+    def ago(self, seconds):
+        """Imagem exibida há 'seconds' segundos"""
+        return self.at(time.time() - seconds)
+
+    def span(self):
+        """(mais antigo, mais recente) instante disponível, ou None se vazio"""
+        with self.lock:
+            if not self.timestamps:
+                return None
+            return self.timestamps[0], self.timestamps[-1]
+
+    def __len__(self):
+        return len(self.entries)
@@ -0,0 +1,108 @@
+# core/http_client.py
+import socket
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from config import Config
+
+class HTTPTransport:
+    """Sessão HTTP compartilhada (pool de conexões keep-alive) para a API DeepSeek"""
+    def __init__(self, pool_connections=None, pool_maxsize=None, pool_block=None,
+                 connect_timeout=None, read_timeout=None, max_retries=None):
+        self.timeout = (
+            connect_timeout if connect_timeout is not None else Config.HTTP.CONNECT_TIMEOUT,
+            read_timeout if read_timeout is not None else Config.HTTP.READ_TIMEOUT
+        )
+
+        # pool_maxsize limita as conexões por host; pool_block faz as requisições
+        # excedentes aguardarem uma conexão livre em vez de abrir conexões avulsas
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections or Config.HTTP.POOL_CONNECTIONS,
+            pool_maxsize=pool_maxsize or Config.HTTP.POOL_MAXSIZE,
+            pool_block=Config.HTTP.POOL_BLOCK if pool_block is None else pool_block,
+            max_retries=Retry(
+                total=Config.HTTP.MAX_RETRIES if max_retries is None else max_retries,
+                connect=Config.HTTP.MAX_RETRIES if max_retries is None else max_retries,
+                read=0,
+                status=0,
+                allowed_methods=False
+            )
+        )
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def post(self, url, **kwargs):
+        """POST com timeouts padrão (connect, read) reutilizando conexões do pool"""
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.post(url, **kwargs)
+
+    def get(self, url, **kwargs):
+        """GET com timeouts padrão (connect, read) reutilizando conexões do pool"""
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.get(url, **kwargs)
+
+    def close(self):
+        """Fecha todas as conexões do pool"""
+        self.session.close()
+
+class AsyncHTTPTransport:
+    """Cliente HTTP assíncrono (httpx) com os mesmos limites e timeouts do transporte síncrono"""
+    def __init__(self, pool_maxsize=None, connect_timeout=None, read_timeout=None, max_retries=None):
+        import httpx
+
+        connect_timeout = connect_timeout if connect_timeout is not None else Config.HTTP.CONNECT_TIMEOUT
+        read_timeout = read_timeout if read_timeout is not None else Config.HTTP.READ_TIMEOUT
+        pool_maxsize = pool_maxsize or Config.HTTP.POOL_MAXSIZE
+
+        # Como no transporte síncrono, apenas falhas de conexão são repetidas
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=pool_maxsize, max_keepalive_connections=pool_maxsize),
+            transport=httpx.AsyncHTTPTransport(
+                retries=Config.HTTP.MAX_RETRIES if max_retries is None else max_retries
+            )
+        )
+
+    async def post(self, url, **kwargs):
+        """POST assíncrono reutilizando conexões do pool"""
+        return await self.client.post(url, **kwargs)
+
+    def stream(self, method, url, **kwargs):
+        """Requisição com corpo lido incrementalmente (usar com 'async with')"""
+        return self.client.stream(method, url, **kwargs)
+
+    async def aclose(self):
+        """Fecha todas as conexões do pool"""
+        await self.client.aclose()
+
+def abort_response(response):
+    """Interrompe, de outra thread, a leitura de uma resposta (stream=True) em andamento.
+
+    Desligar o socket acorda a leitura bloqueada, que falha; a conexão não volta ao pool.
+    """
+    connection = getattr(response.raw, '_connection', None)
+    sock = getattr(connection, 'sock', None)
+    if sock is None:
+        # Respostas sem keep-alive: a conexão já soltou o socket, que segue aberto no arquivo lido
+        reader = getattr(getattr(response.raw, '_fp', None), 'fp', None)
+        sock = getattr(getattr(reader, 'raw', None), '_sock', None)
+    if sock is None:
+        response.close()
+        return
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+
+_shared_transport = None
+_shared_lock = threading.Lock()
+
+def get_transport():
+    """Retorna o transporte HTTP compartilhado por todos os clientes da API"""
+    global _shared_transport
+    with _shared_lock:
+        if _shared_transport is None:
+            _shared_transport = HTTPTransport()
+        return _shared_transport
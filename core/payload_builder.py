@@ -0,0 +1,70 @@
+# core/payload_builder.py
+import threading
+import logging
+
+def normalize_text(text):
+    """Normaliza quebras de linha e espaços finais para que o mesmo conteúdo gere os mesmos bytes"""
+    return "\n".join(line.rstrip() for line in text.replace("\r\n", "\n").split("\n")).strip()
+
+class PayloadBuilder:
+    """Monta o corpo da requisição com prefixo estável, aproveitando o cache de contexto da API.
+
+    A ordem é sempre: instruções de sistema, contexto fixado, histórico e, por último,
+    a pergunta atual. Assim requisições seguidas compartilham o maior prefixo possível.
+    """
+    def __init__(self, model, system_prompt, params=None):
+        self.model = model
+        self.system_prompt = normalize_text(system_prompt)
+        self.params = dict(params or {})
+
+    def build(self, query, history=(), pinned_context=None, stream=False):
+        """Retorna o payload; pinned_context é anexado às instruções de sistema"""
+        system = self.system_prompt
+        if pinned_context:
+            system = f"{system}\n\n[[CONTEXTO]]\n{normalize_text(pinned_context)}"
+
+        payload = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": system},
+                *history,
+                {"role": "user", "content": query}
+            ],
+            **self.params
+        }
+        if stream:
+            # O último evento do streaming traz o campo 'usage'
+            payload["stream"] = True
+            payload["stream_options"] = {"include_usage": True}
+        return payload
+
+class UsageStats:
+    """Acumula o uso de tokens informado pela API, incluindo os acertos do cache de contexto"""
+    def __init__(self):
+        self.logger = logging.getLogger('AEGIS')
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cache_hit_tokens = 0
+        self.cache_miss_tokens = 0
+
+    def record(self, usage):
+        """Registra o campo 'usage' de uma resposta (ignora se ausente)"""
+        if not usage:
+            return
+        hit = usage.get('prompt_cache_hit_tokens', 0)
+        miss = usage.get('prompt_cache_miss_tokens', 0)
+        with self.lock:
+            self.requests += 1
+            self.prompt_tokens += usage.get('prompt_tokens', 0)
+            self.completion_tokens += usage.get('completion_tokens', 0)
+            self.cache_hit_tokens += hit
+            self.cache_miss_tokens += miss
+        self.logger.debug(f"Prompt cache: {hit} hit / {miss} miss tokens (total hit ratio {self.hit_ratio:.0%})")
+
+    @property
+    def hit_ratio(self):
+        """Fração dos tokens de entrada atendidos pelo cache de contexto"""
+        total = self.cache_hit_tokens + self.cache_miss_tokens
+        return self.cache_hit_tokens / total if total else 0.0
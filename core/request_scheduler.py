@@ -0,0 +1,149 @@
+# core/request_scheduler.py
+import queue
+import threading
+import logging
+from collections import deque
+from config import Config
+
+class SchedulerBusyError(RuntimeError):
+    """Há requisições pendentes demais (a API está lenta); a nova foi recusada"""
+
+class CancelToken:
+    """Sinal de cancelamento consultado pela tarefa durante a execução"""
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks = []
+
+    def cancel(self):
+        # Os callbacks rodam com o lock: quem desfaz o registro espera o callback terminar
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            for callback in self._callbacks:
+                try:
+                    callback()
+                except Exception:
+                    pass
+            self._callbacks = []
+
+    def on_cancel(self, callback):
+        """Registra uma função chamada ao cancelar (ex.: fechar a conexão); já cancelado, chama na hora.
+
+        Retorna uma função que desfaz o registro (usar quando o recurso for liberado).
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return lambda: self._discard(callback)
+        callback()
+        return lambda: None
+
+    def _discard(self, callback):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+class RequestScheduler:
+    """Executa as chamadas à API num pool fixo de threads.
+
+    Cada chave (aba) tem sua fila: as requisições da mesma aba rodam em ordem, uma por vez,
+    e abas diferentes rodam em paralelo. A tarefa recebe um CancelToken como primeiro argumento.
+    As threads do pool são daemon: uma chamada em andamento não impede o encerramento do app.
+    """
+    def __init__(self, max_workers=None, max_pending=None):
+        self.logger = logging.getLogger('AEGIS')
+        self.max_pending = max_pending or Config.AI.MAX_PENDING_REQUESTS
+        self.queue = queue.SimpleQueue()  # (chave, token, função, argumentos) prontos para executar
+        self.workers = [
+            threading.Thread(target=self._worker, name=f"aegis-request-{i}", daemon=True)
+            for i in range(max_workers or Config.AI.MAX_CONCURRENT_REQUESTS)
+        ]
+        self.lock = threading.Lock()
+        self.lanes = {}   # chave -> deque de (token, função, argumentos)
+        self.active = {}  # chave -> token da requisição em execução
+        self.pending = 0  # na fila ou em execução
+        self.closed = False
+        for worker in self.workers:
+            worker.start()
+
+    def submit(self, key, fn, *args, supersede=False):
+        """Enfileira fn(token, *args) na fila da chave e retorna o token.
+
+        Com supersede=True, cancela as requisições anteriores da mesma chave.
+        Levanta SchedulerBusyError quando o limite de pendências foi atingido.
+        """
+        with self.lock:
+            if self.closed:
+                raise RuntimeError("Request scheduler is shut down")
+            lane = self.lanes.setdefault(key, deque())
+            if supersede:
+                self._cancel_locked(key)
+            if self.pending >= self.max_pending:
+                raise SchedulerBusyError(f"{self.pending} requests pending")
+
+            token = CancelToken()
+            lane.append((token, fn, args))
+            self.pending += 1
+            if key not in self.active:
+                self._start_next(key)
+            return token
+
+    def cancel(self, key=None):
+        """Cancela as requisições da chave (ou de todas as chaves)"""
+        with self.lock:
+            for lane_key in ([key] if key is not None else list(self.lanes)):
+                self._cancel_locked(lane_key)
+
+    def shutdown(self):
+        """Cancela tudo e encerra o pool sem aguardar as chamadas em andamento"""
+        self.cancel()
+        with self.lock:
+            self.closed = True
+        for _ in self.workers:
+            self.queue.put(None)
+
+    def _cancel_locked(self, key):
+        """Cancela a requisição em execução e descarta as enfileiradas (chamar com lock)"""
+        lane = self.lanes.get(key)
+        while lane:
+            token, _, _ = lane.popleft()
+            token.cancel()
+            self.pending -= 1
+        if key in self.active:
+            self.active[key].cancel()
+
+    def _start_next(self, key):
+        """Inicia a próxima requisição da fila da chave (chamar com lock)"""
+        lane = self.lanes.get(key)
+        if not lane:
+            self.active.pop(key, None)
+            return
+        token, fn, args = lane.popleft()
+        self.active[key] = token
+        self.queue.put((key, token, fn, args))
+
+    def _worker(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            self._run(*item)
+
+    def _run(self, key, token, fn, args):
+        try:
+            if not token.cancelled:
+                fn(token, *args)
+        except Exception as e:
+            self.logger.exception(f"Request failed: {e}")
+        finally:
+            with self.lock:
+                self.pending -= 1
+                self.active.pop(key, None)
+                if not self.closed:
+                    self._start_next(key)
@@ -0,0 +1,170 @@
+# core/response_cache.py
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import logging
+from config import Config
+from core.payload_builder import normalize_text
+
+# Campos que não alteram a resposta gerada
+TRANSPORT_PARAMS = ('stream', 'stream_options')
+
+def normalize_query(text):
+    """Normaliza a pergunta: caixa, espaços e pontuação final"""
+    return re.sub(r'\s+', ' ', text.casefold()).strip().rstrip('?!.;, ')
+
+def trigrams(text):
+    """Conjunto de trigramas de caracteres (índice leve para quase-duplicatas)"""
+    text = f"  {text} "
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+# Palavras que invertem o sentido da pergunta
+NEGATIONS = frozenset((
+    'não', 'nao', 'nunca', 'nem', 'sem', 'jamais', 'nenhum', 'nenhuma', 'nada',
+    'not', 'no', 'never', 'without', 'nor', 'none', 'nothing'
+))
+
+def exact_terms(text):
+    """Números e negações da pergunta: devem coincidir para reaproveitar uma resposta parecida"""
+    words = re.findall(r"[\w']+", text)
+    return (
+        [word for word in words if any(char.isdigit() for char in word)],
+        [word for word in words if word in NEGATIONS or word.endswith("n't")]
+    )
+
+def _digest(data):
+    return hashlib.sha256(json.dumps(data, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+class ResponseCache:
+    """Cache persistente (SQLite) de respostas da API.
+
+    A busca exata usa a chave do pedido normalizado (modo, modelo, parâmetros, mensagens).
+    A busca por quase-duplicata (opcional, desativada com similarity=0) compara apenas pedidos
+    com o mesmo contexto (instruções e histórico), usando a similaridade de Jaccard entre
+    trigramas das perguntas; números e negações precisam ser idênticos. Trocas de sentido
+    como antônimos ("pares"/"ímpares") não são detectadas: use limiares altos.
+    """
+    def __init__(self, path=None, ttl=None, max_entries=None, similarity=None):
+        self.path = path or Config.AI.RESPONSE_CACHE_PATH
+        self.ttl = ttl or Config.AI.RESPONSE_CACHE_TTL
+        self.max_entries = max_entries or Config.AI.RESPONSE_CACHE_MAX_ENTRIES
+        self.similarity = Config.AI.RESPONSE_CACHE_SIMILARITY if similarity is None else similarity
+        self.logger = logging.getLogger('AEGIS')
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.db = sqlite3.connect(self.path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, context_key TEXT, query TEXT, response TEXT,"
+            " created REAL, last_used REAL)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS responses_context ON responses (context_key, last_used)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+        self.db.commit()
+
+    def _keys(self, mode, payload):
+        """(chave exata, chave do contexto, pergunta normalizada) de um payload"""
+        messages = payload['messages']
+        context = {
+            "mode": mode,
+            "params": {k: v for k, v in payload.items() if k not in TRANSPORT_PARAMS and k != 'messages'},
+            "messages": [
+                {"role": message['role'], "content": normalize_text(message['content'])}
+                for message in messages[:-1]
+            ]
+        }
+        query = normalize_query(messages[-1]['content'])
+        context_key = _digest(context)
+        return _digest([context_key, query]), context_key, query
+
+    def get(self, mode, payload):
+        """Resposta em cache para o payload ou None"""
+        started = time.perf_counter()
+        key, context_key, query = self._keys(mode, payload)
+        now = time.time()
+        with self.lock:
+            row = self.db.execute(
+                "SELECT key, response FROM responses WHERE key = ? AND created > ?",
+                (key, now - self.ttl)
+            ).fetchone()
+            if row is None and self.similarity:
+                row = self._nearest(context_key, query, now)
+                if row is not None:
+                    self.near_hits += 1
+            elif row is not None:
+                self.hits += 1
+
+            if row is None:
+                self.misses += 1
+                return None
+            self.db.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, row[0]))
+            self.db.commit()
+
+        self.logger.debug(f"Response cache hit in {(time.perf_counter() - started) * 1000:.1f} ms")
+        return row[1]
+
+    def _nearest(self, context_key, query, now, candidates=200):
+        """Pergunta mais parecida com o mesmo contexto, se acima do limiar (chamar com lock)"""
+        target = trigrams(query)
+        terms = exact_terms(query)
+        best, best_score = None, self.similarity
+        rows = self.db.execute(
+            "SELECT key, query, response FROM responses"
+            " WHERE context_key = ? AND created > ? ORDER BY last_used DESC LIMIT ?",
+            (context_key, now - self.ttl, candidates)
+        )
+        for key, other, response in rows:
+            grams = trigrams(other)
+            score = len(target & grams) / len(target | grams)
+            if score >= best_score and exact_terms(other) == terms:
+                best, best_score = (key, response), score
+        return best
+
+    def put(self, mode, payload, response):
+        """Armazena a resposta e aplica o limite de entradas (remove as menos usadas)"""
+        if not response:
+            return
+        key, context_key, query = self._keys(mode, payload)
+        now = time.time()
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (key, context_key, query, response, now, now)
+            )
+            self.db.execute("DELETE FROM responses WHERE created <= ?", (now - self.ttl,))
+            self.db.execute(
+                "DELETE FROM responses WHERE key IN ("
+                " SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self.db.commit()
+
+    def stats(self):
+        """Métricas do cache"""
+        with self.lock:
+            lookups = self.hits + self.near_hits + self.misses
+            return {
+                "hits": self.hits,
+                "near_hits": self.near_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.near_hits) / lookups if lookups else 0.0
+            }
+
+    def clear(self):
+        """Remove todas as entradas"""
+        with self.lock:
+            self.db.execute("DELETE FROM responses")
+            self.db.commit()
+
+    def close(self):
+        with self.lock:
+            self.db.close()
@@ -1,43 +1,264 @@
 import pyautogui
 import mss
+import numpy as np
 from PIL import Image
+import ctypes
+import sys
 import threading
 import time
+from collections import deque
+from config import Config
+from core.frame_history import FrameHistory
+
+def user_idle_seconds():
+    """Segundos desde a última entrada do usuário (Windows); None se não disponível"""
+    if sys.platform != "win32":
+        return None
+
+    class LASTINPUTINFO(ctypes.Structure):
+        _fields_ = [("cbSize", ctypes.c_uint), ("dwTime", ctypes.c_uint)]
+
+    info = LASTINPUTINFO()
+    info.cbSize = ctypes.sizeof(info)
+    if not ctypes.windll.user32.GetLastInputInfo(ctypes.byref(info)):
+        return None
+    return ((ctypes.windll.kernel32.GetTickCount() - info.dwTime) & 0xFFFFFFFF) / 1000
+
+class ScreenFrame:
+    """Captura publicada: pixels BGRA da janela e regiões alteradas desde a anterior"""
+    def __init__(self, raw, region, changed, tiles, timestamp, tile_size):
+        self.raw = raw  # ndarray (altura, largura, 4) em BGRA
+        self.region = region  # {"left", "top", "width", "height"} da área capturada
+        self.changed = changed  # caixas (x, y, largura, altura) relativas à área capturada
+        self.tiles = tiles  # máscara booleana (linhas, colunas) dos blocos alterados
+        self.tile_size = tile_size
+        self.timestamp = timestamp
+        self._image = None
+
+    @property
+    def size(self):
+        return self.raw.shape[1], self.raw.shape[0]
+
+    @property
+    def image(self):
+        """Imagem PIL em RGB, convertida apenas quando solicitada"""
+        if self._image is None:
+            self._image = Image.frombuffer("RGB", self.size, self.raw.tobytes(), "raw", "BGRX", 0, 1)
+        return self._image
 
 class ScreenMonitor:
-    def __init__(self):
-        self.latest_screenshot = None
+    def __init__(self, tile_size=32, min_interval=None, max_interval=None, cpu_budget=None,
+                 idle_check=user_idle_seconds, keep_history=None):
+        self.latest_frame = None
         self.monitoring = False
-        self.interval = 5 # Seconds beteween captures
         self.thread = None
+        self.stop_event = threading.Event()
+
+        # Agendamento adaptativo: intervalo mínimo com a tela mudando, dobra a cada captura
+        # sem mudanças até o máximo; o custo medido de cada captura respeita o orçamento de CPU
+        self.min_interval = min_interval or Config.SCREEN_MONITOR_MIN_INTERVAL
+        self.max_interval = max_interval or Config.SCREEN_MONITOR_INTERVAL
+        self.cpu_budget = cpu_budget or Config.SCREEN_CPU_BUDGET
+        self.idle_check = idle_check
+        self.interval = self.min_interval
+        self.capture_cost = 0.0  # média móvel do tempo de CPU por captura
+
+        # Contadores
+        self.captures = 0
+        self.published = 0
+        self.skipped = 0
+        self._capture_times = deque(maxlen=120)
+
+        # Detecção de mudanças: assinatura por bloco de tile_size x tile_size pixels
+        # (amostrada a cada 2 pixels, por isso o bloco precisa ter tamanho par)
+        if tile_size < 2 or tile_size % 2:
+            raise ValueError(f"tile_size must be an even number >= 2, got {tile_size}")
+        self.tile_size = tile_size
+        self._signature = None
+        self._signature_region = None
+        self._weights = None
+        self._padded = None  # buffers reutilizados entre capturas (recriados se o tamanho mudar)
+        self._signatures = None
+        self.subscribers = []  # chamados com cada ScreenFrame publicado (thread de captura)
+
+        # Quadros recentes para consultas por instante (ex.: history.ago(30))
+        keep_history = Config.SCREEN_HISTORY if keep_history is None else keep_history
+        self.history = FrameHistory() if keep_history else None
+        if self.history is not None:
+            self.subscribe(self.history.add)
+
+    @property
+    def latest_screenshot(self):
+        return self.latest_frame.image if self.latest_frame else None
+
+    def subscribe(self, callback):
+        """Registra uma função chamada a cada novo quadro com mudanças"""
+        self.subscribers.append(callback)
+
+    @property
+    def capture_rate(self):
+        """Capturas por segundo nas capturas recentes"""
+        if len(self._capture_times) < 2:
+            return 0.0
+        span = self._capture_times[-1] - self._capture_times[0]
+        return (len(self._capture_times) - 1) / span if span > 0 else 0.0
+
+    def stats(self):
+        """Contadores do monitoramento"""
+        return {
+            "captures": self.captures,
+            "published": self.published,
+            "skipped": self.skipped,
+            "capture_rate": self.capture_rate,
+            "interval": self.interval,
+            "capture_cost": self.capture_cost
+        }
 
     def start_monitoring(self):
         self.monitoring = True
+        self.stop_event.clear()
         self.thread = threading.Thread(target=self._capture_loop)
         self.thread.daemon = True
         self.thread.start()
 
     def stop_monitoring(self):
         self.monitoring = False
+        self.stop_event.set()  # acorda o loop imediatamente
         if self.thread:
             self.thread.join()
 
     def _capture_loop(self):
-        while self.monitoring:
+        # Um único capturador por thread, reutilizado em todos os ciclos
+        with mss.mss() as sct:
+            while self.monitoring:
+                started = time.thread_time()
+                try:
+                    frame = self.capture(sct)
+                except Exception as e:
+                    print(f"capture error: {str(e)}")
+                    frame = None
+                cost = time.thread_time() - started
+                self.capture_cost = cost if not self.captures else 0.8 * self.capture_cost + 0.2 * cost
+                self.interval = self._next_interval(frame is not None)
+                if self.stop_event.wait(self.interval):
+                    break
+
+    def _next_interval(self, changed):
+        """Intervalo até a próxima captura"""
+        if changed:
+            interval = self.min_interval
+        else:
+            interval = min(self.max_interval, self.interval * 2)
+
+        # Usuário ausente: nada deve mudar na tela por iniciativa dele
+        idle = self.idle_check() if self.idle_check else None
+        if idle is not None and idle >= Config.SCREEN_IDLE_SECONDS:
+            interval = self.max_interval
+
+        # Orçamento de CPU: custo / intervalo não pode passar da fração permitida
+        return max(interval, self.capture_cost / self.cpu_budget)
+
+    def _capture_region(self, sct):
+        """Área da janela ativa (ou do monitor principal, se indisponível)"""
+        try:
+            active_window = pyautogui.getActiveWindow()
+        except Exception:
+            active_window = None
+        if active_window is None or active_window.width <= 0 or active_window.height <= 0:
+            return dict(sct.monitors[1])
+        return {
+            "left": active_window.left,
+            "top": active_window.top,
+            "width": active_window.width,
+            "height": active_window.height
+        }
+
+    def capture(self, sct):
+        """Captura uma vez; publica e retorna o quadro apenas se o conteúdo mudou"""
+        region = self._capture_region(sct)
+        sct_img = sct.grab(region)
+        self.captures += 1
+        self._capture_times.append(time.monotonic())
+        raw = np.frombuffer(sct_img.raw, dtype=np.uint8).reshape(sct_img.height, sct_img.width, 4)
+
+        signature = self._tile_signature(raw)
+        geometry = (region["left"], region["top"], raw.shape[1], raw.shape[0])
+        if self._signature is None or geometry != self._signature_region:
+            tiles = np.ones(signature.shape, dtype=bool)
+        else:
+            tiles = signature != self._signature
+        self._signature = signature
+        self._signature_region = geometry
+        if not tiles.any():
+            self.skipped += 1
+            return None
+        self.published += 1
+
+        frame = ScreenFrame(raw, region, self._changed_boxes(tiles, raw.shape), tiles, time.time(), self.tile_size)
+        self.latest_frame = frame
+        for callback in self.subscribers:
             try:
-                active_window = pyautogui.getActiveWindow()
-                with mss.mss() as sct:
-                    monitor = {
-                        "left": active_window.left,
-                        "top": active_window.top,
-                        "width": active_window.width,
-                        "height": active_window.height
-                    }
-                    sct_img = sct.grab(monitor)
-                    self.lates_screenshot = Image.frombytes("RGB", sct_img.size, sct_img.rgb)
+                callback(frame)
             except Exception as e:
-                print(f"capture error: {str(e)}")
-            time.sleep(self.interval)
+                print(f"screen subscriber error: {str(e)}")
+        return frame
+
+    def _tile_signature(self, raw):
+        """Soma ponderada (pesos pseudoaleatórios fixos) dos pixels amostrados de cada bloco"""
+        tile = self.tile_size
+        height, width = raw.shape[:2]
+        rows, cols = -(-height // tile), -(-width // tile)
+
+        # Amostra 1 a cada 2 pixels em cada eixo; o preenchimento (zeros) completa os blocos da borda
+        sample = raw[::2, ::2, :3]
+        half = tile // 2
+        if self._padded is None or self._padded.shape != (rows * half, cols * half, 3):
+            self._padded = np.zeros((rows * half, cols * half, 3), dtype=np.uint8)
+            self._signatures = [np.empty((rows, cols), dtype=np.uint64) for _ in range(2)]
+        np.copyto(self._padded[:sample.shape[0], :sample.shape[1]], sample)
+
+        if self._weights is None:
+            self._weights = np.random.default_rng(0).integers(1, 2**16, size=(half, half, 3), dtype=np.uint64)
+        # A conversão para uint64 é feita em blocos pelo einsum, sem cópia do quadro inteiro;
+        # as duas saídas alternam para que a assinatura anterior continue válida na comparação
+        out = self._signatures[0]
+        self._signatures.reverse()
+        blocks = self._padded.reshape(rows, half, cols, half, 3)
+        return np.einsum('rycxk,yxk->rc', blocks, self._weights, out=out, dtype=np.uint64, casting='unsafe')
+
+    def _changed_boxes(self, tiles, shape):
+        """Agrupa os blocos alterados em caixas: trechos contíguos por linha, unidos entre linhas vizinhas"""
+        tile = self.tile_size
+        height, width = shape[:2]
+        boxes = []
+        open_boxes = {}  # (coluna inicial, coluna final) -> [linha inicial, linha final]
+        for row in range(tiles.shape[0]):
+            runs = []
+            cols = np.flatnonzero(tiles[row])
+            if len(cols):
+                breaks = np.flatnonzero(np.diff(cols) > 1)
+                starts = np.concatenate(([cols[0]], cols[breaks + 1]))
+                ends = np.concatenate((cols[breaks], [cols[-1]]))
+                runs = list(zip(starts.tolist(), ends.tolist()))
+
+            next_open = {}
+            for run in runs:
+                span = open_boxes.pop(run, [row, row])
+                span[1] = row
+                next_open[run] = span
+            boxes.extend((run, span) for run, span in open_boxes.items())
+            open_boxes = next_open
+        boxes.extend((run, span) for run, span in open_boxes.items())
+
+        return [(
+            c0 * tile,
+            r0 * tile,
+            min(width, (c1 + 1) * tile) - c0 * tile,
+            min(height, (r1 + 1) * tile) - r0 * tile
+        ) for (c0, c1), (r0, r1) in boxes]
+
+    def get_current_context(self):
+        return self.latest_screenshot
 
-    def get_currente_context(self):
-        return self.latest_screenshot
\ No newline at end of file
+    # Nome anterior mantido por compatibilidade
+    get_currente_context = get_current_context
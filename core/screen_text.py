@@ -0,0 +1,154 @@
+# core/screen_text.py
+import bisect
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+import numpy as np
+from config import Config
+
+class ScreenTextExtractor:
+    """Texto da tela para o contexto do modelo, reconhecendo (OCR) apenas as faixas alteradas.
+
+    Cada quadro é dividido em faixas horizontais nos espaços em branco entre linhas de texto.
+    Faixas sem blocos alterados reaproveitam o texto anterior; as alteradas são procuradas no
+    cache pelo hash dos pixels (texto que apenas mudou de posição, ex.: rolagem, não é relido)
+    e as restantes são reconhecidas juntas, numa única chamada ao OCR.
+    """
+    def __init__(self, monitor=None, max_chars=None, band_height=None, cache_size=512, language=None):
+        self.logger = logging.getLogger('AEGIS')
+        self.max_chars = max_chars or Config.MAX_CODE_CONTEXT
+        self.band_height = band_height or Config.SCREEN_OCR_BAND_HEIGHT
+        self.language = language or Config.SCREEN_OCR_LANGUAGE
+        self.cache_size = cache_size
+        self.cache = OrderedDict()  # hash da faixa -> texto
+        self.bands = []  # (topo, base, hash, texto) do quadro atual, de cima para baixo
+        self.focus = 0  # índice da última faixa alterada
+        self.lock = threading.Lock()
+        self.available = True
+
+        # Métricas
+        self.recognized = 0
+        self.cache_hits = 0
+        self.reused = 0
+
+        if monitor is not None:
+            monitor.subscribe(self.process)
+
+    def process(self, frame):
+        """Atualiza o texto a partir de um ScreenFrame publicado pelo ScreenMonitor"""
+        raw = frame.raw
+        luma = (raw[..., 2] * 0.299 + raw[..., 1] * 0.587 + raw[..., 0] * 0.114).astype(np.uint8)
+        previous = {(top, bottom): (digest, text) for top, bottom, digest, text in self.bands}
+        tile = frame.tile_size
+        changed_rows = frame.tiles.any(axis=1)
+
+        bands, pending = [], []
+        for top, bottom in self._segment(luma):
+            if (top, bottom) in previous and not changed_rows[top // tile:(bottom - 1) // tile + 1].any():
+                self.reused += 1
+                bands.append([top, bottom, *previous[(top, bottom)]])
+                continue
+
+            crop = luma[top:bottom]
+            digest = hashlib.blake2b(crop.tobytes(), digest_size=16).digest()
+            text = self._cached(digest)
+            if text is None:
+                pending.append(len(bands))
+            bands.append([top, bottom, digest, text])
+            self.focus = len(bands) - 1
+
+        if pending:
+            texts = self._recognize([luma[bands[i][0]:bands[i][1]] for i in pending])
+            for i, text in zip(pending, texts or [""] * len(pending)):
+                bands[i][3] = text
+                if texts is not None:
+                    self._store(bands[i][2], text)
+
+        with self.lock:
+            self.bands = [tuple(band) for band in bands]
+            self.focus = min(self.focus, max(0, len(bands) - 1))
+
+    def get_context(self):
+        """Texto da tela limitado a max_chars, priorizando as linhas próximas da última alteração"""
+        with self.lock:
+            bands, focus = self.bands, self.focus
+        texts = [band[3] for band in bands]
+
+        # Expande a janela a partir da faixa em foco enquanto couber no limite
+        selected, total = set(), 0
+        order = sorted(range(len(texts)), key=lambda i: abs(i - focus))
+        for i in order:
+            if not texts[i]:
+                continue
+            if total + len(texts[i]) + 1 > self.max_chars:
+                break
+            selected.add(i)
+            total += len(texts[i]) + 1
+        return "\n".join(texts[i] for i in sorted(selected))
+
+    def _segment(self, luma, threshold=12):
+        """Faixas [topo, base) de linhas com conteúdo, cortadas nas linhas uniformes (espaços)"""
+        sample = luma[:, ::2]
+        blank = (sample.max(axis=1) - sample.min(axis=1)) < threshold
+        rows = np.flatnonzero(np.diff(np.concatenate(([1], blank.astype(np.int8), [1]))))
+        bands = []
+        for start, end in zip(rows[::2], rows[1::2]):
+            # Trechos altos sem espaços (ex.: imagens) são fatiados em faixas de altura fixa
+            for top in range(start, end, self.band_height):
+                bands.append((max(0, top - 2), min(len(luma), min(end, top + self.band_height) + 2)))
+        return bands
+
+    def _cached(self, digest):
+        text = self.cache.get(digest)
+        if text is not None:
+            self.cache.move_to_end(digest)
+            self.cache_hits += 1
+        return text
+
+    def _store(self, digest, text):
+        self.cache[digest] = text
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    def _recognize(self, crops, gap=16):
+        """Reconhece várias faixas empilhadas numa única imagem; retorna o texto de cada uma (None se falhar)"""
+        if not self.available:
+            return None
+        try:
+            import pytesseract
+            from PIL import Image
+        except ImportError:
+            self.logger.warning("pytesseract not installed, screen text extraction disabled")
+            self.available = False
+            return None
+
+        width = max(crop.shape[1] for crop in crops)
+        height = sum(crop.shape[0] + gap for crop in crops)
+        canvas = np.full((height, width), 255, dtype=np.uint8)
+        offsets, y = [], 0
+        for crop in crops:
+            # O OCR espera texto escuro sobre fundo claro (temas escuros são invertidos)
+            canvas[y:y + crop.shape[0], :crop.shape[1]] = 255 - crop if crop.mean() < 128 else crop
+            offsets.append(y)
+            y += crop.shape[0] + gap
+
+        try:
+            data = pytesseract.image_to_data(
+                Image.fromarray(canvas), lang=self.language, output_type=pytesseract.Output.DICT
+            )
+        except Exception as e:
+            self.logger.warning(f"OCR failed: {e}")
+            return None
+        self.recognized += len(crops)
+
+        # Agrupa as palavras por faixa (pela posição vertical) e por linha do OCR
+        lines = [OrderedDict() for _ in crops]
+        for i, word in enumerate(data['text']):
+            if not word.strip():
+                continue
+            center = data['top'][i] + data['height'][i] / 2
+            band = max(0, bisect.bisect_right(offsets, center) - 1)
+            key = (data['block_num'][i], data['par_num'][i], data['line_num'][i])
+            lines[band].setdefault(key, []).append(word)
+        return ["\n".join(" ".join(words) for words in band.values()) for band in lines]
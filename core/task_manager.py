@@ -1,24 +1,237 @@
+import os
+import re
+import uuid
+import pickle
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
 from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.jobstores.base import ConflictingIdError
+from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
+from apscheduler.util import datetime_to_utc_timestamp
 from plyer import notification
-import dateparser
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import IntegrityError
+from config import Config
+
+# Repetições aceitas em set_alert (além de um número de segundos)
+RECURRENCES = {
+    'hourly': {'hours': 1},
+    'daily': {'days': 1},
+    'weekly': {'weeks': 1}
+}
+
+_RELATIVE_UNITS = {
+    's': 'seconds', 'seg': 'seconds', 'segundo': 'seconds', 'segundos': 'seconds', 'second': 'seconds', 'seconds': 'seconds',
+    'min': 'minutes', 'minuto': 'minutes', 'minutos': 'minutes', 'minute': 'minutes', 'minutes': 'minutes',
+    'h': 'hours', 'hora': 'hours', 'horas': 'hours', 'hour': 'hours', 'hours': 'hours'
+}
+_RELATIVE_PATTERN = re.compile(r'^(?:em|in|daqui a)\s+(\d+)\s*([a-z]+)$')
+_CLOCK_PATTERN = re.compile(r'^(?:às\s+|as\s+|at\s+)?(\d{1,2})(?::|h)(\d{2})?$')
+
+def trigger_alert(message='Scheduled protocol activated'):
+    """Exibe a notificação de um alerta (função de módulo: o job store persistente guarda a referência)"""
+    notification.notify(
+        title='A.E.G.I.S. Alert',
+        message=message,
+        timeout=10
+    )
+
+def _create_engine(path):
+    """Engine SQLite com WAL: gravações sem sincronizar o disco a cada alerta"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    engine = create_engine(f"sqlite:///{path}")
+
+    @event.listens_for(engine, "connect")
+    def _configure(connection, _):
+        cursor = connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
+    return engine
+
+class BatchJobStore(SQLAlchemyJobStore):
+    """Job store SQLite em que as inclusões feitas dentro de batch() usam uma única transação"""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._batch = threading.local()
+
+    @contextmanager
+    def batch(self):
+        """Agrupa as inclusões desta thread numa transação, confirmada ao final do bloco"""
+        with self.engine.begin() as connection:
+            self._batch.connection = connection
+            try:
+                yield
+            finally:
+                self._batch.connection = None
+
+    def add_job(self, job):
+        connection = getattr(self._batch, 'connection', None)
+        if connection is None:
+            return super().add_job(job)
+        insert = self.jobs_t.insert().values(
+            id=job.id,
+            next_run_time=datetime_to_utc_timestamp(job.next_run_time),
+            job_state=pickle.dumps(job.__getstate__(), self.pickle_protocol)
+        )
+        try:
+            connection.execute(insert)
+        except IntegrityError:
+            raise ConflictingIdError(job.id)
 
 class OperationalCoordinator:
-    def __init__(self):
-        self.scheduler = BackgroundScheduler()
+    def __init__(self, db_path=None):
+        self.logger = logging.getLogger('AEGIS')
+
+        # Alertas persistidos em SQLite: sobrevivem a reinícios; os perdidos com o app fechado
+        # rodam na inicialização (dentro da tolerância), com execuções acumuladas unidas em uma
+        self.jobstore = BatchJobStore(engine=_create_engine(db_path or Config.ALERTS_DB))
+        self.scheduler = BackgroundScheduler(
+            jobstores={'default': self.jobstore},
+            job_defaults={
+                'coalesce': True,
+                'misfire_grace_time': Config.ALERT_MISFIRE_GRACE,
+                'max_instances': 1
+            }
+        )
         self.scheduler.start()
 
-    def set_alert(self, time_string):
-        alarm_time = dateparser.parse(time_string)
-        self.scheduler.add_job(
-            self._trigger_alert,
-            'date',
-            run_date=alarm_time
+        # O dateparser é pesado de importar e lento na primeira chamada: carrega em segundo plano.
+        # Até lá, set_alert entrega ao carregador os horários que exigem o dateparser
+        self._parser = None
+        self._parser_ready = threading.Event()
+        self._parser_lock = threading.Lock()
+        self._deferred = []  # (horário, mensagem, repetição) aguardando o dateparser
+        threading.Thread(target=self._load_parser, daemon=True).start()
+
+    def _load_parser(self):
+        try:
+            import dateparser
+            dateparser.parse("amanhã às 10:00", languages=['pt', 'en'])
+        except Exception as e:
+            self.logger.error(f"Could not load dateparser: {e}")
+            dateparser = None
+
+        with self._parser_lock:
+            self._parser = dateparser
+            self._parser_ready.set()
+            deferred, self._deferred = self._deferred, []
+        for alert in deferred:
+            try:
+                self._add_alert(*alert)
+            except ValueError as e:
+                self.logger.warning(str(e))
+                trigger_alert(f"Could not schedule alert: {e}")
+
+    def _parse_fast(self, time_string, now):
+        """Formatos simples ('14:30', '16h', 'em 10 minutos', 'in 2 hours') sem o dateparser"""
+        text = time_string.strip().lower()
+
+        match = _RELATIVE_PATTERN.match(text)
+        if match and match.group(2) in _RELATIVE_UNITS:
+            return now + timedelta(**{_RELATIVE_UNITS[match.group(2)]: int(match.group(1))})
+
+        match = _CLOCK_PATTERN.match(text)
+        if match and int(match.group(1)) < 24 and int(match.group(2) or 0) < 60:
+            alarm_time = now.replace(hour=int(match.group(1)), minute=int(match.group(2) or 0), second=0, microsecond=0)
+            return alarm_time if alarm_time > now else alarm_time + timedelta(days=1)
+        return None
+
+    def parse_time(self, time_string, now=None):
+        """Interpreta o horário; formatos fora dos simples aguardam o carregamento do dateparser"""
+        now = now or datetime.now()
+        alarm_time = self._parse_fast(time_string, now)
+        if alarm_time is not None:
+            return alarm_time
+
+        self._parser_ready.wait()
+        if self._parser is None:
+            raise ValueError(f"Could not parse alert time (dateparser unavailable): {time_string}")
+        return self._parser.parse(
+            time_string,
+            languages=['pt', 'en'],
+            settings={'PREFER_DATES_FROM': 'future', 'RELATIVE_BASE': now}
         )
+
+    def set_alert(self, time_string, message=None, recurrence=None):
+        """Agenda um alerta; recurrence: 'hourly', 'daily', 'weekly' ou intervalo em segundos.
+
+        Não bloqueia: com o dateparser ainda carregando, o agendamento é concluído em segundo plano.
+        Levanta ValueError se o horário não for reconhecido ou já tiver passado.
+        """
+        with self._parser_lock:
+            if not self._parser_ready.is_set() and self._parse_fast(time_string, datetime.now()) is None:
+                self._deferred.append((time_string, message, recurrence))
+                return f"Alert for '{time_string}' received, confirmation pending"
+        _, alarm_time = self._add_alert(time_string, message, recurrence)
         return f"Alert confirmed for {alarm_time.strftime('%H:%M:%S ZULU')}"
 
-    def _trigger_alert(self):
-        notification.notify(
-            title='A.E.G.I.S. Alert',
-            message='Scheduled protocol activated',
-            timeout=10
-        )
\ No newline at end of file
+    def set_alerts(self, alerts):
+        """Agenda vários alertas numa única transação: itens (horário, mensagem, repetição); retorna os ids.
+
+        Todos os horários são interpretados antes de gravar: um inválido levanta ValueError e nada é agendado.
+        """
+        prepared = [self._prepare(*alert) for alert in alerts]
+        # Pausado, o agendador recalcula a próxima execução uma única vez no final
+        self.scheduler.pause()
+        try:
+            with self.jobstore.batch():
+                return [self.scheduler.add_job(**job).id for job, _ in prepared]
+        finally:
+            self.scheduler.resume()
+
+    def _add_alert(self, time_string, message=None, recurrence=None):
+        job, alarm_time = self._prepare(time_string, message, recurrence)
+        return self.scheduler.add_job(**job), alarm_time
+
+    def _prepare(self, time_string, message=None, recurrence=None):
+        """Argumentos de add_job do alerta e o horário do primeiro disparo"""
+        alarm_time = self.parse_time(time_string)
+        if alarm_time is None:
+            raise ValueError(f"Could not parse alert time: {time_string}")
+
+        if recurrence is None:
+            # O APScheduler descartaria em silêncio um alerta único no passado
+            if alarm_time <= datetime.now(alarm_time.tzinfo):
+                raise ValueError(f"Alert time is in the past: {time_string} ({alarm_time:%Y-%m-%d %H:%M})")
+            trigger, trigger_args = 'date', {'run_date': alarm_time}
+        else:
+            interval = RECURRENCES.get(recurrence) or {'seconds': int(recurrence)}
+            trigger, trigger_args = 'interval', {**interval, 'start_date': alarm_time}
+
+        job = dict(
+            func=trigger_alert,
+            trigger=trigger,
+            kwargs={'message': message} if message else {},
+            id=uuid.uuid4().hex,
+            name=message or time_string,
+            **trigger_args
+        )
+        return job, alarm_time
+
+    def list_alerts(self):
+        """Alertas pendentes: (id, descrição, próxima execução)"""
+        return [(job.id, job.name, job.next_run_time) for job in self.scheduler.get_jobs()]
+
+    def cancel_alert(self, job_id):
+        """Cancela um alerta; retorna False se não existir"""
+        try:
+            self.scheduler.remove_job(job_id)
+            return True
+        except Exception:
+            return False
+
+    def cancel_alerts(self, job_ids=None):
+        """Cancela os alertas informados (ou todos); retorna quantos foram removidos"""
+        if job_ids is None:
+            count = len(self.scheduler.get_jobs())
+            self.scheduler.remove_all_jobs()
+            return count
+        return sum(self.cancel_alert(job_id) for job_id in job_ids)
+
+    def shutdown(self):
+        """Encerra o agendador (os alertas pendentes continuam salvos)"""
+        self.scheduler.shutdown(wait=False)
@@ -0,0 +1,166 @@
+# core/tts_cache.py
+import os
+import json
+import hashlib
+import threading
+import logging
+from collections import OrderedDict
+import numpy as np
+
+class PhraseCache:
+    """Cache de frases sintetizadas: LRU em memória e arquivos PCM em disco.
+
+    Só vão para o disco as frases fixas (put com persist=True) e as que se repetem
+    (pedidas persist_after vezes); frases avulsas das respostas ficam apenas na memória.
+    """
+    def __init__(self, cache_dir, model, params, sample_rate,
+                 memory_limit=16 * 1024 * 1024, disk_limit=64 * 1024 * 1024, max_text_length=200,
+                 persist_after=2, max_tracked=4096):
+        self.cache_dir = cache_dir
+        self.sample_rate = sample_rate
+        self.memory_limit = memory_limit
+        self.disk_limit = disk_limit
+        self.max_text_length = max_text_length
+        self.persist_after = persist_after
+        self.max_tracked = max_tracked
+        self.logger = logging.getLogger('voice')
+
+        # Tudo que altera o áudio gerado faz parte da chave
+        self.namespace = json.dumps(
+            {"model": os.path.basename(model), "params": params, "sample_rate": sample_rate},
+            sort_keys=True
+        )
+
+        self.memory = OrderedDict()
+        self.memory_bytes = 0
+        self.requests = OrderedDict()  # chave -> vezes em que a frase foi pedida (só em memória)
+        self.persisted = set()  # chaves já gravadas ou encontradas em disco
+        self.disk_bytes = None  # calculado na primeira gravação
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, text):
+        """Chave endereçada pelo conteúdo (texto + modelo + parâmetros de voz)"""
+        return hashlib.sha256(f"{self.namespace}\n{text.strip()}".encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.pcm")
+
+    def get(self, text):
+        """Retorna as amostras int16 da frase ou None"""
+        key = self.key(text)
+        with self.lock:
+            count = self._count(key)
+            data = self.memory.get(key)
+            if data is not None:
+                self.memory.move_to_end(key)
+                self.hits += 1
+                persist = count == self.persist_after and key not in self.persisted
+        if data is not None:
+            # Frase repetida: passa a sobreviver ao reinício
+            if persist and len(text) <= self.max_text_length:
+                self._write(key, data)
+            return data
+
+        try:
+            with open(self._path(key), 'rb') as f:
+                data = np.frombuffer(f.read(), dtype=np.int16)
+        except FileNotFoundError:
+            with self.lock:
+                self.misses += 1
+            return None
+
+        # Promove para a memória e marca o arquivo como usado recentemente
+        try:
+            os.utime(self._path(key))
+        except OSError:
+            pass
+        with self.lock:
+            self.hits += 1
+            self.persisted.add(key)
+            self._remember(key, data)
+        return data
+
+    def put(self, text, data, persist=False):
+        """Armazena as amostras int16 de uma frase na memória e, se fixa ou repetida, em disco"""
+        if len(text) > self.max_text_length:
+            return
+        key = self.key(text)
+        data = np.ascontiguousarray(data, dtype=np.int16)
+        with self.lock:
+            self._remember(key, data)
+            persist = persist or self.requests.get(key, 0) >= self.persist_after
+        if persist:
+            self._write(key, data)
+
+    def _count(self, key):
+        """Registra um pedido da frase e retorna o total (chamar com lock)"""
+        count = self.requests.get(key, 0) + 1
+        self.requests[key] = count
+        self.requests.move_to_end(key)
+        while len(self.requests) > self.max_tracked:
+            self.requests.popitem(last=False)
+        return count
+
+    def _write(self, key, data):
+        """Grava a frase em disco (uma única vez)"""
+        with self.lock:
+            if key in self.persisted:
+                return
+            self.persisted.add(key)
+        path = self._path(key)
+        if os.path.exists(path):
+            return
+        try:
+            # Escreve em arquivo temporário para que leituras concorrentes nunca vejam arquivo parcial
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data.tobytes())
+            os.replace(tmp_path, path)
+            self._account_disk(data.nbytes)
+        except OSError as e:
+            self.logger.warning(f"Could not write phrase cache entry: {e}")
+
+    def _remember(self, key, data):
+        """Insere no LRU em memória respeitando o limite de bytes (chamar com lock)"""
+        if key in self.memory:
+            self.memory.move_to_end(key)
+            return
+        self.memory[key] = data
+        self.memory_bytes += data.nbytes
+        while self.memory_bytes > self.memory_limit and len(self.memory) > 1:
+            _, old = self.memory.popitem(last=False)
+            self.memory_bytes -= old.nbytes
+
+    def _account_disk(self, added):
+        """Mantém o cache em disco dentro do limite, removendo os arquivos menos usados"""
+        with self.lock:
+            if self.disk_bytes is None:
+                self.disk_bytes = sum(size for _, size, _ in self._disk_entries())
+            else:
+                self.disk_bytes += added
+            if self.disk_bytes <= self.disk_limit:
+                return
+
+            entries = sorted(self._disk_entries(), key=lambda entry: entry[2])
+            for path, size, _ in entries:
+                if self.disk_bytes <= self.disk_limit * 0.9:
+                    break
+                try:
+                    os.remove(path)
+                    self.disk_bytes -= size
+                    self.persisted.discard(os.path.basename(path)[:-len('.pcm')])
+                except OSError:
+                    pass
+
+    def _disk_entries(self):
+        """Lista (caminho, tamanho, último uso) dos arquivos do cache"""
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith('.pcm'):
+                stat = entry.stat()
+                entries.append((entry.path, stat.st_size, stat.st_mtime))
+        return entries
@@ -0,0 +1,72 @@
+# core/ui_bus.py
+import queue
+import logging
+from config import Config
+
+class UIEventBus:
+    """Fila única de atualizações da interface: threads publicam, o loop do Tk executa em lotes.
+
+    A verificação é adaptativa: rápida enquanto há eventos, espaçada quando ocioso.
+    """
+    def __init__(self, root, min_interval=None, max_interval=None, batch_size=200):
+        self.root = root
+        self.min_interval = min_interval or Config.UI.BUS_MIN_INTERVAL_MS
+        self.max_interval = max_interval or Config.UI.BUS_MAX_INTERVAL_MS
+        self.batch_size = batch_size
+        self.logger = logging.getLogger('AEGIS')
+        self.events = queue.SimpleQueue()
+        self.sources = []  # (fila, função chamada na thread do Tk para cada item)
+        self.interval = self.min_interval
+        self._after_id = None
+
+    def post(self, callback, *args):
+        """Agenda callback(*args) na thread do Tk (pode ser chamado de qualquer thread)"""
+        self.events.put((callback, args))
+
+    def add_source(self, source_queue, handler):
+        """Drena também uma fila existente (ex.: comandos de voz) no mesmo ciclo"""
+        self.sources.append((source_queue, handler))
+
+    def start(self):
+        """Inicia o ciclo de drenagem no loop do Tk"""
+        if self._after_id is None:
+            self._after_id = self.root.after(self.min_interval, self._drain)
+
+    def stop(self):
+        """Interrompe o ciclo de drenagem"""
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _drain(self):
+        """Executa até batch_size eventos pendentes e agenda a próxima verificação"""
+        handled = 0
+        for source_queue, handler in self.sources:
+            while handled < self.batch_size:
+                try:
+                    item = source_queue.get_nowait()
+                except queue.Empty:
+                    break
+                self._run(handler, (item,))
+                handled += 1
+
+        while handled < self.batch_size:
+            try:
+                callback, args = self.events.get_nowait()
+            except queue.Empty:
+                break
+            self._run(callback, args)
+            handled += 1
+
+        # Ocupado: volta ao intervalo mínimo; ocioso: dobra o intervalo até o máximo
+        if handled:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.max_interval, self.interval * 2)
+        self._after_id = self.root.after(self.interval, self._drain)
+
+    def _run(self, callback, args):
+        try:
+            callback(*args)
+        except Exception as e:
+            self.logger.exception(f"UI event failed: {e}")
@@ -3,15 +3,27 @@ import speech_recognition as sr
 import threading
 import time
 import queue
+import heapq
+import itertools
+from collections import deque
 import sounddevice as sd
-import soundfile as sf
 import subprocess
 import os
+import re
+import json
 import logging
+from abc import ABC, abstractmethod
 from pathlib import Path
 from config import Config
+from core.tts_cache import PhraseCache
+from core.wake_word import WakeWordDetector
+from core.audio_capture import AudioCapture
 import numpy as np
 
+# Prioridades de fala (menor valor é falado primeiro)
+PRIORITY_SYSTEM = 0  # avisos do sistema e confirmações
+PRIORITY_ANSWER = 1  # respostas do assistente
+
 class Voice:
     """Classe para gerenciamento de voz"""
     def __init__(self):
@@ -26,16 +38,22 @@ class Voice:
         self.command_queue = queue.Queue()
         self.listening_active = False
         
+        # Captura contínua do microfone (ou de outra fonte, ex.: FileSource em testes)
+        self.audio_source = None
+        self.capture = None
+        self.playback_started = 0.0
+        self.playback_ended = 0.0
+        
         # Configuração do Piper TTS
         self.piper_model = Config.Voice.PIPER_MODEL
         
-        # Configuração do reconhecimento de voz
-        self.recognizer = sr.Recognizer()
+        # Configuração do reconhecimento de voz (backend em Config.Voice.STT_BACKEND)
+        self.recognizer = create_speech_to_text()
         self.wake_word = "aegis"  # Palavra de ativação
         self.energy_threshold = 300  # Sensibilidade para detecção de fala (valor menor = mais sensível)
-        self.recognizer.energy_threshold = self.energy_threshold
-        self.recognizer.dynamic_energy_threshold = True  # Ajusta a sensibilidade dinamicamente
-        self.recognizer.pause_threshold = 0.8  # Pausa entre palavras (reduzido para capturar frases completas)
+        
+        # Detecção local da wake word; sem gravações de referência, a confirmação usa a nuvem
+        self.wake_detector = WakeWordDetector(energy_threshold=self.energy_threshold)
         
         try:
             # Configurações de áudio
@@ -108,94 +126,86 @@ class Voice:
             model_path = os.path.join(Config.Voice.PIPER_MODELS_DIR, self.piper_model)
             if not os.path.exists(model_path):
                 raise FileNotFoundError(f"Voice model not found: {model_path}")
+            
+            # Processo persistente: o modelo é carregado uma única vez
+            self.piper_worker = PiperWorker(self.piper_path, model_path, self.logger)
+            self.piper_worker.start()
+            
+            # Frases já sintetizadas tocam sem passar pelo Piper
+            self.phrase_cache = PhraseCache(
+                Config.Voice.PHRASE_CACHE_DIR,
+                model_path,
+                {
+                    "noise_scale": Config.Voice.NOISE_SCALE,
+                    "sentence_silence": Config.Voice.SENTENCE_SILENCE
+                },
+                self.piper_worker.sample_rate,
+                memory_limit=Config.Voice.PHRASE_CACHE_MEMORY_MB * 1024 * 1024,
+                disk_limit=Config.Voice.PHRASE_CACHE_DISK_MB * 1024 * 1024
+            )
+            
+            # Fila única de falas: uma thread sintetiza e outra reproduz
+            self.speech_scheduler = SpeechScheduler(self, Config.Voice.SPEECH_BACKLOG)
+            threading.Thread(target=self.prewarm, args=(Config.Voice.SYSTEM_PHRASES,), daemon=True).start()
         except Exception as e:
             self.logger.error(f"Error setting up Piper: {str(e)}")
             raise
             
-    def speak(self, text):
+    def speak(self, text, priority=None):
         """Síntese de voz"""
-        # Executa a síntese em uma thread separada para não bloquear a interface
-        threading.Thread(target=self._speak_thread, args=(text,), daemon=True).start()
-    
-    def _speak_thread(self, text):
-        """Função interna para síntese de voz em thread separada"""
-        try:
-            self.logger.info(f"Starting synthesis for: '{text}'")
-            
-            # Verificação completa dos arquivos
-            if not os.path.exists(self.piper_path):
-                error_msg = f"Piper executable not found at: {self.piper_path}"
-                self.logger.error(error_msg)
-                raise FileNotFoundError(error_msg)
-            
-            model_path = os.path.join(Config.Voice.PIPER_MODELS_DIR, self.piper_model)
-            if not os.path.exists(model_path):
-                error_msg = f"Voice model not found: {model_path}"
-                self.logger.error(error_msg)
-                raise FileNotFoundError(error_msg)
-            
-            # Geração do arquivo temporário em pasta temporária acessível
-            # Usar pasta temporária do sistema ou pasta AppData
-            temp_dir = os.path.join(os.path.expanduser('~'), 'AppData', 'Local', 'Temp', 'AEGIS')
-            os.makedirs(temp_dir, exist_ok=True)
-            
-            output_file = os.path.join(temp_dir, "temp_response.wav")
-            if os.path.exists(output_file):
-                os.remove(output_file)
-                
-            # Comando com logs detalhados
-            command = [
-                str(self.piper_path),
-                "--model", model_path,
-                "--output_file", output_file,
-                "--sentence_silence", "0.5",
-                "--noise_scale", "0.667"
-            ]
-            self.logger.debug(f"Executing command: {' '.join(command)}")
-            
-            # Execução com timeout
-            process = subprocess.run(
-                command,
-                input=text,
-                text=True,
-                encoding='utf-8',
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                timeout=15
-            )
+        # A fala entra na fila do agendador, que não bloqueia a interface
+        stream = self.open_stream(priority)
+        stream.feed(text)
+        stream.close()
+
+    def open_stream(self, priority=None):
+        """Abre uma fala incremental, alimentada por trechos de texto (ex.: resposta em streaming)"""
+        stream = SpeechStream(PRIORITY_ANSWER if priority is None else priority)
+        self.speech_scheduler.submit(stream)
+        return stream
+
+    def interrupt(self):
+        """Interrompe a fala atual e descarta as pendentes (barge-in)"""
+        self.speech_scheduler.cancel_all()
+
+    def _synthesize(self, text, persist=False):
+        """Sintetiza um trecho de texto e retorna (dados, taxa de amostragem) ou None"""
+        cached = self.phrase_cache.get(text)
+        if cached is not None:
+            self.logger.debug(f"Phrase cache hit for: '{text}'")
+            return cached, self.piper_worker.sample_rate
             
-            # Verificação de erros
-            if process.returncode != 0:
-                error_msg = f"Piper error (Code {process.returncode}):\n{process.stderr}"
-                self.logger.error(error_msg)
-                return
-                
-            if not os.path.exists(output_file):
-                error_msg = "Audio file was not generated"
-                self.logger.error(error_msg)
-                return
-                
-            # Reprodução do áudio
-            self.logger.debug(f"Loading {output_file}...")
-            data, samplerate = sf.read(output_file)
-            self.logger.debug(f"Sample rate: {samplerate} Hz")
+        self.logger.info(f"Starting synthesis for: '{text}'")
+        try:
+            data, samplerate = self.piper_worker.synthesize(text)
+        except (RuntimeError, TimeoutError) as e:
+            self.logger.error(f"Piper error: {str(e)}")
+            return None
             
-            self.logger.debug("Starting playback...")
+        if len(data):
+            # Frases fixas vão para o disco; as das respostas, só se repetidas
+            self.phrase_cache.put(text, data, persist=persist)
+        return data, samplerate
+
+    def prewarm(self, phrases):
+        """Sintetiza antecipadamente frases fixas que ainda não estão no cache"""
+        for phrase in phrases:
+            # As frases são divididas como na fala, para que as chaves coincidam
+            splitter = SentenceSplitter()
+            for sentence in splitter.feed(phrase) + splitter.flush():
+                if self.phrase_cache.get(sentence) is None:
+                    self._synthesize(sentence, persist=True)
+
+    def _play(self, data, samplerate):
+        """Reproduz um trecho de áudio e aguarda o término"""
+        self.logger.debug("Starting playback...")
+        self.playback_started = time.monotonic()
+        try:
             sd.play(data, samplerate)
             sd.wait()
-            self.logger.debug("Playback completed")
-            
-            # Limpar arquivo temporário
-            try:
-                os.remove(output_file)
-                self.logger.debug(f"Temporary file {output_file} removed")
-            except Exception as e:
-                self.logger.warning(f"Could not remove temporary file: {e}")
-            
-        except Exception as e:
-            self.logger.error(f"Critical error in voice synthesis: {str(e)}", exc_info=True)
-            # self.speak("falha no sistema de voz, verifique os logs") # Remove recursive call that could cause stack overflow
-            raise
+        finally:
+            self.playback_ended = time.monotonic()
+        self.logger.debug("Playback completed")
             
     def start_listening(self):
         """Inicia escuta de comandos"""
@@ -216,86 +226,511 @@ class Voice:
         try:
             self.logger.info("Iniciando reconhecimento de wake word")
             
-            # Utiliza a biblioteca SpeechRecognition para reconhecimento
-            with sr.Microphone() as source:
-                self.recognizer.adjust_for_ambient_noise(source, duration=1)
-                self.logger.info(f"Wake word: '{self.wake_word}'. Aguardando...")
-                
-                while self.listening_active:
-                    try:
-                        # Escuta o áudio
-                        audio = self.recognizer.listen(source, timeout=self.listening_timeout, phrase_time_limit=5)
+            # Captura contínua: o reconhecimento de uma fala não interrompe a gravação da próxima
+            self.capture = AudioCapture(self.audio_source)
+            self.capture.start()
+            self.logger.info(f"Wake word: '{self.wake_word}'. Aguardando...")
+            
+            awaiting_command = False
+            wake_time = 0.0
+            while self.listening_active:
+                try:
+                    utterance = self.capture.segments.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+                if utterance is None:
+                    self.logger.info("Fonte de áudio encerrada")
+                    break
+                    
+                try:
+                    # A própria fala do assistente (eco da resposta) não é tratada como comando
+                    if awaiting_command and not self._overlaps_playback(utterance):
+                        awaiting_command = False
+                        waited = utterance.start_time - max(wake_time, self.playback_ended)
+                        if waited <= Config.Voice.COMMAND_TIMEOUT:
+                            self._recognize_command(utterance)
+                            continue
+                        
+                    if self._is_wake_word(utterance):
+                        self.logger.info("Wake word ou fragmento detectado!")
                         
-                        # Tenta reconhecer (usando Google Speech Recognition)
-                        try:
-                            text = self.recognizer.recognize_google(audio, language="pt-BR").lower()
-                            self.logger.info(f"Reconhecido: '{text}'")
-                            
-                            # Verifica se a wake word está presente ou se há uma aproximação próxima
-                            if self.wake_word in text or "aeg" in text or "egi" in text or "gis" in text or "eji" in text:
-                                self.logger.info("Wake word ou fragmento detectado!")
-                                
-                                self.command_queue.put("wake_word_detected")
-                                
-                                # Responde e aguarda o comando do usuário
-                                self.command_queue.put("responder_usuario")
-                                
-                                # Aguarda um comando após a detecção da wake word
-                                # Aumentar tempo de pausa para dar tempo para o sistema responder
-                                time.sleep(2)
-                                
-                                try:
-                                    self.logger.info("Aguardando comando após wake word...")
-                                    # Aumentar timeout de 8 para 15 segundos
-                                    audio_comando = self.recognizer.listen(source, timeout=15, phrase_time_limit=15)
-                                    
-                                    try:
-                                        comando = self.recognizer.recognize_google(audio_comando, language="pt-BR")
-                                        self.logger.info(f"Comando após wake word: '{comando}'")
-                                        
-                                        # Envia o comando real para processamento
-                                        if comando.strip():
-                                            self.command_queue.put(f"comando:{comando}")
-                                    except sr.UnknownValueError:
-                                        self.logger.info("Nenhum comando detectado após wake word")
-                                    except sr.RequestError as e:
-                                        self.logger.error(f"Erro ao processar comando: {e}")
-                                except Exception as e:
-                                    self.logger.error(f"Erro ao capturar comando: {e}")
-                                
-                                # Pausa antes de voltar a escutar a wake word
-                                time.sleep(1)
-                        except sr.UnknownValueError:
-                            # Fala não reconhecida - normal durante silêncio/ruído
-                            pass
-                        except sr.RequestError as e:
-                            self.logger.error(f"Erro na API de reconhecimento: {e}")
-                            
-                    except sr.WaitTimeoutError:
-                        # Timeout normal, continua escutando
-                        pass
-                    except Exception as e:
-                        self.logger.error(f"Erro no processamento de áudio: {e}")
-                        time.sleep(0.5)  # Pausa curta para evitar loop de erros
+                        # Barge-in: o usuário chamou, a fala em andamento é interrompida
+                        self.interrupt()
+                        self.command_queue.put("wake_word_detected")
+                        
+                        # Responde e aguarda o comando do usuário
+                        self.command_queue.put("responder_usuario")
+                        awaiting_command = True
+                        wake_time = utterance.end_time
+                except sr.RequestError as e:
+                    self.logger.error(f"Erro na API de reconhecimento: {e}")
+                except Exception as e:
+                    self.logger.error(f"Erro no processamento de áudio: {e}")
                         
         except Exception as e:
             self.logger.error(f"Erro crítico no stream de áudio: {e}", exc_info=True)
             self.listening_active = False
             raise
+        finally:
+            if self.capture is not None:
+                self.capture.stop()
+                self.capture = None
+            
+    def _recognize_command(self, utterance):
+        """Reconhece o comando falado após a wake word"""
+        try:
+            comando = self.recognizer.transcribe(utterance)
+            if not comando.strip():
+                self.logger.info("Nenhum comando detectado após wake word")
+                return
+            self.logger.info(f"Comando após wake word: '{comando}'")
+            
+            # Envia o comando real para processamento
+            self.command_queue.put(f"comando:{comando}")
+        except sr.RequestError as e:
+            self.logger.error(f"Erro ao processar comando: {e}")
+
+    def _is_playing(self):
+        """Há fala do assistente em reprodução"""
+        return self.playback_started > self.playback_ended
+
+    def _overlaps_playback(self, utterance):
+        """A fala capturada coincide com a reprodução do assistente (eco)"""
+        if self._is_playing():
+            return utterance.end_time > self.playback_started
+        return utterance.start_time < self.playback_ended and utterance.end_time > self.playback_started
+            
+    def _is_wake_word(self, utterance):
+        """Verifica a wake word localmente; só consulta a nuvem se não houver referências gravadas"""
+        if self.wake_detector.has_templates:
+            return self.wake_detector.detect(utterance.samples)
+            
+        # Tenta reconhecer com o backend configurado
+        text = self.recognizer.transcribe(utterance).lower()
+        if not text:
+            return False
+        self.logger.info(f"Reconhecido: '{text}'")
+        
+        # Verifica se a wake word está presente ou se há uma aproximação próxima
+        return self.wake_word in text or "aeg" in text or "egi" in text or "gis" in text or "eji" in text
             
     def stop(self):
         """Encerra todos os recursos"""
         self.stop_listening()
+        self.speech_scheduler.stop()
         sd.stop()
+        self.piper_worker.stop()
         self.logger.info("Voice engine stopped")
 
+class SpeechToText(ABC):
+    """Interface dos backends de reconhecimento de fala, com medição de latência"""
+    name = "base"
+
+    def __init__(self, language=None):
+        self.logger = logging.getLogger('voice')
+        self.language = language or Config.Voice.STT_LANGUAGE
+        self.latencies = deque(maxlen=100)
+
+    def transcribe(self, utterance):
+        """Transcreve uma fala capturada; retorna '' se nada for reconhecido"""
+        started = time.perf_counter()
+        try:
+            return self._transcribe(utterance)
+        finally:
+            latency = time.perf_counter() - started
+            self.latencies.append(latency)
+            self.logger.info(
+                f"[{self.name}] recognition took {latency * 1000:.0f} ms "
+                f"for {utterance.duration:.1f}s of audio (avg {self.average_latency * 1000:.0f} ms)"
+            )
+
+    @property
+    def average_latency(self):
+        """Latência média (segundos) das últimas transcrições"""
+        return sum(self.latencies) / len(self.latencies) if self.latencies else 0.0
+
+    @abstractmethod
+    def _transcribe(self, utterance):
+        """Reconhece a fala (implementado por cada backend)"""
+
+class GoogleSpeechToText(SpeechToText):
+    """Reconhecimento na nuvem (Google Speech Recognition)"""
+    name = "google"
+
+    def __init__(self, language=None):
+        super().__init__(language)
+        self.recognizer = sr.Recognizer()
+
+    def _transcribe(self, utterance):
+        audio = sr.AudioData(utterance.samples.tobytes(), utterance.sample_rate, 2)
+        try:
+            return self.recognizer.recognize_google(audio, language=self.language)
+        except sr.UnknownValueError:
+            # Fala não reconhecida - normal durante silêncio/ruído
+            return ""
+
+class VoskSpeechToText(SpeechToText):
+    """Reconhecimento offline na CPU (Vosk); o modelo é carregado uma única vez"""
+    name = "vosk"
+
+    def __init__(self, model_dir=None, language=None):
+        super().__init__(language)
+        import vosk
+
+        model_dir = model_dir or Config.Voice.VOSK_MODEL_DIR
+        if not os.path.isdir(model_dir):
+            raise FileNotFoundError(f"Vosk model not found: {model_dir}")
+        vosk.SetLogLevel(-1)
+        self.vosk = vosk
+        self.model = vosk.Model(model_dir)
+
+    def _transcribe(self, utterance):
+        recognizer = self.vosk.KaldiRecognizer(self.model, utterance.sample_rate)
+        recognizer.AcceptWaveform(utterance.samples.tobytes())
+        return json.loads(recognizer.FinalResult()).get("text", "")
+
+SPEECH_TO_TEXT_BACKENDS = {
+    "google": GoogleSpeechToText,
+    "vosk": VoskSpeechToText,
+}
+
+def create_speech_to_text(backend=None):
+    """Cria o backend configurado; se o offline não puder ser carregado, usa a nuvem"""
+    backend = (backend or Config.Voice.STT_BACKEND).lower()
+    logger = logging.getLogger('voice')
+    try:
+        recognizer = SPEECH_TO_TEXT_BACKENDS[backend]()
+    except Exception as e:
+        logger.error(f"Could not load speech recognition backend '{backend}': {e}")
+        if backend == "google":
+            raise
+        recognizer = GoogleSpeechToText()
+    logger.info(f"Speech recognition backend: {recognizer.name}")
+    return recognizer
+
+class PiperWorker:
+    """Processo Piper persistente: recebe frases em JSON e devolve PCM bruto pelo stdout"""
+    # Registrado no stderr após todo o áudio de uma linha ter sido escrito no stdout
+    COMPLETION_PATTERN = re.compile(r'Real-time factor: .*audio=([0-9.eE+-]+) sec')
+
+    def __init__(self, piper_path, model_path, logger, timeout=15, max_restarts=3):
+        self.piper_path = piper_path
+        self.model_path = model_path
+        self.logger = logger
+        self.timeout = timeout
+        self.max_restarts = max_restarts
+        self.restarts = 0
+        self.process = None
+        self.completions = None
+        self.lock = threading.Lock()
+        self.sample_rate = self._read_sample_rate()
+        
+        # Áudio recebido do processo atual (int16 mono)
+        self.audio_buffer = bytearray()
+        self.audio_ready = threading.Condition()
+
+    def _read_sample_rate(self):
+        """Lê a taxa de amostragem do arquivo de configuração do modelo"""
+        try:
+            with open(f"{self.model_path}.json", encoding='utf-8') as f:
+                return int(json.load(f)['audio']['sample_rate'])
+        except Exception as e:
+            self.logger.warning(f"Could not read model sample rate, using default: {e}")
+            return Config.Voice.SAMPLE_RATE
+
+    def start(self):
+        """Inicia o processo e as threads de leitura de saída"""
+        command = [
+            str(self.piper_path),
+            "--model", self.model_path,
+            "--json-input",
+            "--output_raw",
+            "--sentence_silence", str(Config.Voice.SENTENCE_SILENCE),
+            "--noise_scale", str(Config.Voice.NOISE_SCALE)
+        ]
+        self.logger.debug(f"Starting Piper worker: {' '.join(command)}")
+        
+        self.process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            bufsize=0
+        )
+        # Cada processo tem sua própria fila, evitando leituras de um processo anterior
+        self.completions = queue.Queue()
+        with self.audio_ready:
+            self.audio_buffer.clear()
+        threading.Thread(target=self._read_stdout, args=(self.process,), daemon=True).start()
+        threading.Thread(target=self._read_stderr, args=(self.process, self.completions), daemon=True).start()
+
+    def is_alive(self):
+        """Verifica se o processo continua em execução"""
+        return self.process is not None and self.process.poll() is None
+
+    def restart(self):
+        """Reinicia o processo (após falha ou travamento)"""
+        self.restarts += 1
+        self.logger.warning(f"Restarting Piper worker (attempt {self.restarts})")
+        self._kill()
+        self.start()
+
+    def synthesize(self, text):
+        """Sintetiza uma frase e retorna (amostras int16, taxa de amostragem)"""
+        with self.lock:
+            if not self.is_alive():
+                if self.restarts >= self.max_restarts:
+                    raise RuntimeError("Piper worker keeps failing, giving up")
+                self.restart()
+                
+            with self.audio_ready:
+                self.audio_buffer.clear()
+                
+            try:
+                line = json.dumps({"text": text}, ensure_ascii=False) + "\n"
+                self.process.stdin.write(line.encode('utf-8'))
+                self.process.stdin.flush()
+                audio_seconds = self.completions.get(timeout=self.timeout)
+            # Em qualquer falha o processo é encerrado e só reiniciado na próxima frase, pela
+            # verificação acima: travamentos seguidos também contam para max_restarts
+            except queue.Empty:
+                self._kill()
+                raise TimeoutError(f"Piper did not answer within {self.timeout}s")
+            except OSError as e:
+                self._kill()
+                raise RuntimeError(f"Piper worker pipe closed: {e}")
+                
+            if audio_seconds is None:
+                self._kill()
+                raise RuntimeError("Piper worker exited unexpectedly")
+            self.restarts = 0
+            
+            # O áudio já foi escrito no pipe; aguarda a thread de leitura alcançá-lo
+            expected = int(audio_seconds * self.sample_rate) * 2
+            with self.audio_ready:
+                self.audio_ready.wait_for(
+                    lambda: len(self.audio_buffer) >= expected - 64, timeout=1.0
+                )
+                size = len(self.audio_buffer) & ~1
+                data = bytes(self.audio_buffer[:size])
+                del self.audio_buffer[:size]
+                
+        return np.frombuffer(data, dtype=np.int16), self.sample_rate
+
+    def _read_stdout(self, process):
+        """Acumula o PCM bruto gerado pelo Piper"""
+        while True:
+            chunk = process.stdout.read(65536)
+            if not chunk:
+                break
+            with self.audio_ready:
+                if process is self.process:
+                    self.audio_buffer.extend(chunk)
+                    self.audio_ready.notify_all()
+
+    def _read_stderr(self, process, completions):
+        """Consome o stderr e detecta o fim de cada frase"""
+        for raw_line in process.stderr:
+            line = raw_line.decode('utf-8', errors='replace').rstrip()
+            match = self.COMPLETION_PATTERN.search(line)
+            if match:
+                completions.put(float(match.group(1)))
+            self.logger.debug(f"piper: {line}")
+        # Processo encerrado: libera quem estiver aguardando
+        completions.put(None)
+
+    def _kill(self):
+        """Encerra o processo atual"""
+        if self.process is None:
+            return
+        try:
+            self.process.kill()
+            self.process.wait(timeout=5)
+        except Exception as e:
+            self.logger.warning(f"Could not stop Piper worker: {e}")
+        self.process = None
+
+    def stop(self):
+        """Encerra o processo de forma ordenada"""
+        with self.lock:
+            if self.is_alive():
+                try:
+                    self.process.stdin.close()
+                    self.process.wait(timeout=5)
+                except Exception:
+                    pass
+            self._kill()
+
+class SentenceSplitter:
+    """Divide texto recebido aos poucos em frases completas"""
+    # Fim de frase: pontuação seguida de espaço, ou quebra de linha
+    SENTENCE_END = re.compile(r'(?<=[.!?…;:])\s+|\n+')
+
+    def __init__(self, min_length=2):
+        self.min_length = min_length
+        self.buffer = ""
+
+    def feed(self, text):
+        """Acrescenta texto e retorna as frases que já estão completas"""
+        self.buffer += text
+        parts = self.SENTENCE_END.split(self.buffer)
+        
+        # O último pedaço ainda pode estar incompleto
+        self.buffer = parts.pop()
+        return [part.strip() for part in parts if len(part.strip()) >= self.min_length]
+
+    def flush(self):
+        """Retorna o texto restante como última frase"""
+        rest, self.buffer = self.buffer.strip(), ""
+        return [rest] if len(rest) >= self.min_length else []
+
+class SpeechStream:
+    """Fala incremental: recebe trechos de texto e os divide em frases para o agendador"""
+    def __init__(self, priority=None):
+        self.priority = PRIORITY_ANSWER if priority is None else priority
+        self.splitter = SentenceSplitter()
+        self.sentences = queue.Queue()
+        self.closed = False
+        self.cancelled = False
+
+    def feed(self, text):
+        """Acrescenta um trecho de texto à fala"""
+        if self.cancelled:
+            return
+        for sentence in self.splitter.feed(text):
+            self.sentences.put(sentence)
+
+    def close(self):
+        """Sinaliza o fim do texto; o restante é falado normalmente"""
+        if self.closed:
+            return
+        self.closed = True
+        for sentence in self.splitter.flush():
+            self.sentences.put(sentence)
+        self.sentences.put(None)
+
+    def cancel(self):
+        """Descarta o restante da fala"""
+        self.cancelled = True
+
+class SpeechScheduler:
+    """Fila única e ordenada de falas com prioridades, limite de pendências e barge-in"""
+    def __init__(self, voice, max_backlog=8):
+        self.voice = voice
+        self.max_backlog = max_backlog
+        self.pending = []  # heap de (prioridade, sequência, fala)
+        self.sequence = itertools.count()
+        self.condition = threading.Condition()
+        self.generation = 0  # incrementada a cada cancelamento geral
+        self.current = None
+        self.running = True
+        
+        # Sintetiza a frase N+1 enquanto a frase N é reproduzida
+        self.audio = queue.Queue(maxsize=2)
+        threading.Thread(target=self._synth_loop, daemon=True).start()
+        threading.Thread(target=self._play_loop, daemon=True).start()
+
+    def submit(self, stream):
+        """Enfileira uma fala; com a fila cheia, descarta a pendência menos prioritária e mais antiga"""
+        with self.condition:
+            heapq.heappush(self.pending, (stream.priority, next(self.sequence), stream))
+            if len(self.pending) > self.max_backlog:
+                dropped = max(self.pending, key=lambda item: (item[0], -item[1]))
+                self.pending.remove(dropped)
+                heapq.heapify(self.pending)
+                dropped[2].cancel()
+                self.voice.logger.warning("Speech backlog full, dropping pending utterance")
+            self.condition.notify()
+
+    def cancel_all(self):
+        """Cancela a fala atual e todas as pendentes, parando a reprodução"""
+        with self.condition:
+            self.generation += 1
+            for _, _, stream in self.pending:
+                stream.cancel()
+            self.pending.clear()
+            if self.current is not None:
+                self.current.cancel()
+        
+        # Descarta áudio já sintetizado
+        try:
+            while True:
+                self.audio.get_nowait()
+        except queue.Empty:
+            pass
+        sd.stop()
+
+    def stop(self):
+        """Encerra as threads do agendador"""
+        self.cancel_all()
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+
+    def _next_stream(self):
+        """Aguarda a próxima fala da fila"""
+        with self.condition:
+            while self.running and not self.pending:
+                self.condition.wait()
+            if not self.running:
+                return None, None
+            self.current = heapq.heappop(self.pending)[2]
+            return self.current, self.generation
+
+    def _synth_loop(self):
+        """Sintetiza as frases de uma fala por vez, na ordem da fila"""
+        while True:
+            stream, generation = self._next_stream()
+            if stream is None:
+                self.audio.put(None)
+                break
+                
+            while not stream.cancelled:
+                try:
+                    sentence = stream.sentences.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if sentence is None:
+                    break
+                try:
+                    result = self.voice._synthesize(sentence)
+                    if result is not None and not stream.cancelled:
+                        self.audio.put((generation, result))
+                except Exception as e:
+                    self.voice.logger.error(f"Critical error in voice synthesis: {str(e)}", exc_info=True)
+                    
+            with self.condition:
+                self.current = None
+
+    def _play_loop(self):
+        """Reproduz os trechos sintetizados em ordem"""
+        while True:
+            item = self.audio.get()
+            if item is None:
+                break
+            generation, result = item
+            if generation != self.generation:
+                continue  # Áudio de uma fala cancelada
+            try:
+                self.voice._play(*result)
+            except Exception as e:
+                self.voice.logger.error(f"Error during playback: {str(e)}", exc_info=True)
+
 class VoiceEngine:
     def __init__(self):
         self.voice = Voice()
         
-    def speak(self, text):
+    def speak(self, text, priority=None):
         """Síntese de voz"""
-        self.voice.speak(text)
+        self.voice.speak(text, priority)
+
+    def open_stream(self, priority=None):
+        """Abre uma fala incremental alimentada por trechos de texto"""
+        return self.voice.open_stream(priority)
+
+    def interrupt(self):
+        """Interrompe a fala atual e descarta as pendentes"""
+        self.voice.interrupt()
         
     def start_listening(self):
         """Inicia escuta de comandos"""
@@ -0,0 +1,203 @@
+# core/wake_word.py
+import os
+import time
+import logging
+import numpy as np
+import soundfile as sf
+from config import Config
+
+def _mel_filterbank(sample_rate, n_fft, n_mels):
+    """Banco de filtros triangulares na escala mel"""
+    def hz_to_mel(hz):
+        return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+    def mel_to_hz(mel):
+        return 700.0 * (10 ** (mel / 2595.0) - 1.0)
+
+    mel_points = np.linspace(hz_to_mel(0), hz_to_mel(sample_rate / 2), n_mels + 2)
+    bins = np.floor((n_fft + 1) * mel_to_hz(mel_points) / sample_rate).astype(int)
+
+    filters = np.zeros((n_mels, n_fft // 2 + 1))
+    for m in range(1, n_mels + 1):
+        left, center, right = bins[m - 1], bins[m], bins[m + 1]
+        if center > left:
+            filters[m - 1, left:center] = (np.arange(left, center) - left) / (center - left)
+        if right > center:
+            filters[m - 1, center:right] = (right - np.arange(center, right)) / (right - center)
+    return filters
+
+def mfcc(samples, sample_rate=16000, n_mfcc=13, n_mels=26, frame_ms=25, hop_ms=10):
+    """Coeficientes MFCC (quadros x coeficientes) com normalização pela média"""
+    samples = np.asarray(samples)
+    if samples.dtype == np.int16:
+        samples = samples / 32768.0
+    samples = samples.astype(np.float32)
+
+    frame_len = int(sample_rate * frame_ms / 1000)
+    hop = int(sample_rate * hop_ms / 1000)
+    if len(samples) < frame_len:
+        return np.zeros((0, n_mfcc), dtype=np.float32)
+
+    # Pré-ênfase e janelamento
+    emphasized = np.append(samples[0], samples[1:] - 0.97 * samples[:-1])
+    n_frames = 1 + (len(emphasized) - frame_len) // hop
+    index = np.arange(frame_len)[None, :] + hop * np.arange(n_frames)[:, None]
+    frames = emphasized[index] * np.hamming(frame_len)
+
+    n_fft = 512
+    power = (np.abs(np.fft.rfft(frames, n_fft)) ** 2) / n_fft
+    energies = np.log(power @ _mel_filterbank(sample_rate, n_fft, n_mels).T + 1e-10)
+
+    # DCT-II das energias log-mel
+    k = np.arange(n_mels)
+    basis = np.cos(np.pi * np.arange(n_mfcc)[:, None] * (2 * k + 1) / (2 * n_mels))
+    coeffs = energies @ basis.T
+    return (coeffs - coeffs.mean(axis=0)).astype(np.float32)
+
+def subsequence_dtw(template, segment):
+    """Distância DTW do modelo contra o melhor trecho do segmento (início e fim livres)"""
+    if len(template) == 0 or len(segment) == 0:
+        return np.inf
+
+    # Distância cosseno entre quadros, ignorando o coeficiente de energia
+    a = template[:, 1:] / (np.linalg.norm(template[:, 1:], axis=1, keepdims=True) + 1e-8)
+    b = segment[:, 1:] / (np.linalg.norm(segment[:, 1:], axis=1, keepdims=True) + 1e-8)
+    cost = 1.0 - a @ b.T
+
+    # Cada quadro do modelo avança 0, 1 ou 2 quadros do segmento (fala até 2x mais rápida),
+    # o que permite vetorizar cada linha
+    acc = cost[0].copy()
+    for i in range(1, len(template)):
+        prev = acc.copy()
+        prev[1:] = np.minimum(prev[1:], acc[:-1])
+        prev[2:] = np.minimum(prev[2:], acc[:-2])
+        acc = cost[i] + prev
+    return float(acc.min() / len(template))
+
+class WakeWordDetector:
+    """Detecção local da palavra de ativação: porta de energia + comparação com gravações de referência"""
+    def __init__(self, templates_dir=None, sample_rate=16000, threshold=None, energy_threshold=None):
+        self.logger = logging.getLogger('voice')
+        self.sample_rate = sample_rate
+        self.templates_dir = templates_dir or Config.Voice.WAKE_WORD_TEMPLATES_DIR
+        self.threshold = threshold or Config.Voice.WAKE_WORD_THRESHOLD
+        self.energy_threshold = energy_threshold or Config.Voice.WAKE_WORD_ENERGY_THRESHOLD
+        self.max_window = int(Config.Voice.WAKE_WORD_MAX_SECONDS * sample_rate)
+        self.hangover = int(0.3 * sample_rate)  # silêncio que encerra um trecho
+        self.templates = []
+        self.load_templates()
+
+        # Estado do modo streaming
+        self._segment = []
+        self._segment_length = 0
+        self._silence = 0
+
+    @property
+    def has_templates(self):
+        """Há gravações de referência para a detecção local"""
+        return bool(self.templates)
+
+    def load_templates(self):
+        """Carrega as gravações de referência (.wav) do diretório de modelos"""
+        self.templates = []
+        if not os.path.isdir(self.templates_dir):
+            return
+        for name in sorted(os.listdir(self.templates_dir)):
+            if name.lower().endswith('.wav'):
+                self.enroll_file(os.path.join(self.templates_dir, name), save=False)
+        self.logger.info(f"Loaded {len(self.templates)} wake word templates")
+
+    def enroll(self, samples, save=True):
+        """Adiciona uma gravação da palavra de ativação (int16, na taxa do detector)"""
+        samples = np.asarray(samples)
+        features = mfcc(self._trim_silence(samples), self.sample_rate)
+        if len(features) == 0:
+            raise ValueError("Template recording is too short")
+        self.templates.append(features)
+
+        if save:
+            os.makedirs(self.templates_dir, exist_ok=True)
+            path = os.path.join(self.templates_dir, f"template_{int(time.time() * 1000)}.wav")
+            sf.write(path, samples.astype(np.int16), self.sample_rate, subtype='PCM_16')
+
+    def enroll_file(self, path, save=True):
+        """Adiciona uma gravação de referência a partir de um WAV"""
+        self.enroll(self._read_wav(path), save=save)
+
+    def is_speech(self, samples):
+        """Porta de energia: descarta silêncio e ruído de fundo"""
+        if len(samples) == 0:
+            return False
+        rms = np.sqrt(np.mean(np.asarray(samples, dtype=np.float32) ** 2))
+        return rms >= self.energy_threshold
+
+    def detect(self, samples):
+        """Verifica se a palavra de ativação aparece no início do trecho (int16)"""
+        samples = np.asarray(samples)[:self.max_window]
+        if not self.templates or not self.is_speech(samples):
+            return False
+        features = mfcc(samples, self.sample_rate)
+        distance = min(subsequence_dtw(template, features) for template in self.templates)
+        self.logger.debug(f"Wake word distance: {distance:.3f} (threshold {self.threshold})")
+        return distance <= self.threshold
+
+    def detect_file(self, path):
+        """Executa a detecção sobre um WAV gravado"""
+        return self.detect(self._read_wav(path))
+
+    def process(self, frame):
+        """Modo streaming: recebe quadros int16 e retorna True quando a palavra é detectada"""
+        frame = np.asarray(frame)
+        if self.is_speech(frame):
+            self._silence = 0
+        elif self._segment:
+            # Tolera pausas curtas dentro da palavra
+            self._silence += len(frame)
+        else:
+            return False
+
+        self._segment.append(frame)
+        self._segment_length += len(frame)
+        if self._silence < self.hangover and self._segment_length < self.max_window:
+            return False
+
+        segment = np.concatenate(self._segment)
+        self.reset()
+        return self.detect(segment)
+
+    def reset(self):
+        """Descarta o trecho parcial do modo streaming"""
+        self._segment = []
+        self._segment_length = 0
+        self._silence = 0
+
+    def _read_wav(self, path):
+        """Lê um WAV como int16 mono na taxa do detector"""
+        data, rate = sf.read(path, dtype='int16', always_2d=True)
+        data = data[:, 0]
+        if rate != self.sample_rate:
+            positions = np.linspace(0, len(data) - 1, int(len(data) * self.sample_rate / rate))
+            data = np.interp(positions, np.arange(len(data)), data).astype(np.int16)
+        return data
+
+    def _trim_silence(self, samples, frame=320):
+        """Remove silêncio no início e no fim de uma gravação de referência"""
+        n = len(samples) // frame
+        if n == 0:
+            return samples
+        voiced = [i for i in range(n) if self.is_speech(samples[i * frame:(i + 1) * frame])]
+        if not voiced:
+            return samples
+        return samples[voiced[0] * frame:(voiced[-1] + 1) * frame]
+
+if __name__ == "__main__":
+    import sounddevice as sd
+
+    detector = WakeWordDetector()
+    print(f"Gravando modelos da palavra de ativação em: {detector.templates_dir}")
+    for i in range(3):
+        input(f"[{i + 1}/3] Pressione Enter e diga 'AEGIS'...")
+        recording = sd.rec(int(1.5 * detector.sample_rate), samplerate=detector.sample_rate, channels=1, dtype='int16')
+        sd.wait()
+        detector.enroll(recording[:, 0])
+    print("Modelos gravados com sucesso!")
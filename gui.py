@@ -1,12 +1,13 @@
 # gui.py
 import tkinter as tk
 import ttkbootstrap as ttk
-import queue
-import threading
 import time
 from ttkbootstrap.constants import *
 from core.cognitive_core import CognitiveCore
-from core.voice_engine import VoiceEngine
+from core.voice_engine import VoiceEngine, PRIORITY_SYSTEM
+from core.chat_log import ChatLog, TranscriptStore
+from core.ui_bus import UIEventBus
+from core.request_scheduler import RequestScheduler, SchedulerBusyError
 from config import Config
 
 class AEGISInterface(ttk.Window):
@@ -34,22 +35,27 @@ class AEGISInterface(ttk.Window):
         
         # Sistemas principais
         self.cognitive_core = CognitiveCore()
+        self.request_scheduler = RequestScheduler()
         self.voice_engine = VoiceEngine()
         self.listening_active = False
         
+        # Atualizações da interface vindas de outras threads passam pela fila de eventos
+        self.ui_bus = UIEventBus(self)
+        self.ui_bus.add_source(self.voice_engine.command_queue, self._on_voice_command)
+        
         # Inicialização de serviços
-        self._start_voice_monitor()
+        self.ui_bus.start()
         self.voice_engine.start_listening()
         self.after(500, self._play_startup_sequence)
 
     def _play_startup_sequence(self):
         """Executa a sequência de inicialização com voz"""
-        self.voice_engine.speak("Carregando arquivos necessários, por favor aguarde")
+        self.voice_engine.speak("Carregando arquivos necessários, por favor aguarde", PRIORITY_SYSTEM)
         self.after(2000, self._play_ready_sound)
 
     def _play_ready_sound(self):
         """Mensagem de sistema pronto"""
-        self.voice_engine.speak("Sistema inicializado com sucesso, como posso ajudar Senhor?")
+        self.voice_engine.speak("Sistema inicializado com sucesso, como posso ajudar Senhor?", PRIORITY_SYSTEM)
         self.update_idletasks()
 
     def _configure_theme(self):
@@ -139,7 +145,8 @@ class AEGISInterface(ttk.Window):
         chat_frame.pack(fill=tk.BOTH, expand=True)
         
         # Área de histórico
-        chat_log = tk.Text(chat_frame,
+        chat_log = ChatLog(chat_frame,
+            TranscriptStore.for_session(mode),
             wrap=tk.WORD,
             font=("Consolas", 12),
             bg=self.colors["main_bg"],
@@ -184,47 +191,86 @@ class AEGISInterface(ttk.Window):
         
         input_widget.delete(0, tk.END)
         self._update_chat(chat_widget, "Você", query, mode)
-        
-        threading.Thread(
-            target=self._generate_response,
-            args=(query, mode, chat_widget),
-            daemon=True
-        ).start()
+        self._submit_request(query, mode, chat_widget)
+
+    def _submit_request(self, query, mode, chat_widget, supersede=False):
+        """Agenda a resposta no pool de requisições (nunca na thread do Tk)"""
+        try:
+            self.request_scheduler.submit(
+                mode, self._generate_response, query, mode, chat_widget,
+                supersede=supersede
+            )
+        except SchedulerBusyError:
+            self._update_chat(chat_widget, "Erro", "Sistema ocupado, aguarde as respostas pendentes.", mode)
 
-    def _generate_response(self, query, mode, chat_widget):
-        """Gera e exibe resposta"""
+    def _generate_response(self, token, query, mode, chat_widget):
+        """Gera e exibe resposta (executado no pool de requisições)"""
+        if Config.AI.STREAM_RESPONSES:
+            self._stream_response(token, query, mode, chat_widget)
+            return
+            
         try:
-            response = self.cognitive_core.generate_response(query, mode)
-            self._update_chat(chat_widget, "A.E.G.I.S.", response, mode)
+            # Cancelar a requisição (substituída ou app encerrado) fecha a conexão em andamento
+            response = self.cognitive_core.generate_response(query, mode, cancel_token=token)
+            if token.cancelled:
+                return
+            self.ui_bus.post(self._update_chat, chat_widget, "A.E.G.I.S.", response, mode)
             self.voice_engine.speak(response)
         except Exception as e:
+            if token.cancelled:
+                return
             error_msg = f"Erro do sistema: {str(e)}"
-            self._update_chat(chat_widget, "Erro", error_msg, mode)
+            self.ui_bus.post(self._update_chat, chat_widget, "Erro", error_msg, mode)
+
+    def _stream_response(self, token, query, mode, chat_widget):
+        """Gera resposta em streaming, exibindo cada trecho assim que chega"""
+        started = False
+        # A fala só entra na fila com o primeiro trecho: aberta antes, ocuparia a síntese
+        # (falas do sistema e da outra aba) durante toda a espera pela API
+        speech = None
+        # O token é verificado a cada evento do streaming; cancelar fecha a conexão
+        chunks = self.cognitive_core.stream_response(query, mode, cancel_token=token)
+        try:
+            for chunk in chunks:
+                if token.cancelled:
+                    break
+                if not started:
+                    self.ui_bus.post(chat_widget.begin_message, "A.E.G.I.S.", "daily" if mode == "daily" else "dev")
+                    # A fala começa assim que a primeira frase completa chega
+                    speech = self.voice_engine.open_stream()
+                    started = True
+                self.ui_bus.post(self._append_chat, chat_widget, chunk, mode)
+                speech.feed(chunk)
+                
+            if started:
+                self.ui_bus.post(chat_widget.end_message)
+        except Exception as e:
+            if started:
+                self.ui_bus.post(chat_widget.end_message)
+            if not token.cancelled:
+                error_msg = f"Erro do sistema: {str(e)}"
+                self.ui_bus.post(self._update_chat, chat_widget, "Erro", error_msg, mode)
+        finally:
+            chunks.close()
+            if speech is not None:
+                if token.cancelled:
+                    # Requisição substituída: interrompe a fala
+                    speech.cancel()
+                speech.close()
 
     def _update_chat(self, chat_widget, sender, message, mode):
         """Atualiza o histórico do chat"""
         tag = "daily" if mode == "daily" else "dev"
-        chat_widget.config(state=tk.NORMAL)
-        chat_widget.insert(tk.END, f"\n{sender}:\n", "bold")
-        chat_widget.insert(tk.END, f"{message}\n\n", tag)
-        chat_widget.config(state=tk.DISABLED)
-        chat_widget.see(tk.END)
+        chat_widget.add_message(sender, message, tag)
 
-    def _start_voice_monitor(self):
-        """Inicia monitoramento de voz"""
-        self.after(100, self._check_voice_queue)
+    def _append_chat(self, chat_widget, text, mode):
+        """Acrescenta texto à mensagem em streaming do chat"""
+        chat_widget.append_text(text)
 
-    def _check_voice_queue(self):
-        """Processa comandos de voz"""
-        try:
-            while True:
-                command = self.voice_engine.command_queue.get_nowait()
-                current_mode = "dev" if "DESENVOLVEDOR" in self.indicators['mode'].cget("text") else "daily"
-                self._process_voice_command(command, current_mode)
-        except queue.Empty:
-            pass
-        finally:
-            self.after(100, self._check_voice_queue)
+    def _on_voice_command(self, command):
+        """Processa comandos de voz (executado na thread do Tk pela fila de eventos)"""
+        current_mode = "dev" if "DESENVOLVEDOR" in self.indicators['mode'].cget("text") else "daily"
+        self._process_voice_command(command, current_mode)
 
     def _process_voice_command(self, command, mode):
         """Processa comando de voz"""
@@ -236,7 +282,7 @@ class AEGISInterface(ttk.Window):
             
         elif command == "responder_usuario":
             # Responde ao usuário após detectar a wake word
-            self.voice_engine.speak("Sim, senhor. Como posso ajudar?")
+            self.voice_engine.speak("Sim, senhor. Como posso ajudar?", PRIORITY_SYSTEM)
             return
             
         # Verifica se é um comando real após a wake word
@@ -249,18 +295,14 @@ class AEGISInterface(ttk.Window):
             chat_widget = getattr(self, f"{mode}_chat_log")
             self._update_chat(chat_widget, "Você", user_command, mode)
             
-            # Gera resposta via DeepSeek
-            threading.Thread(
-                target=self._generate_response,
-                args=(user_command, mode, chat_widget),
-                daemon=True
-            ).start()
+            # Gera resposta via DeepSeek; um novo comando de voz substitui o anterior
+            self._submit_request(user_command, mode, chat_widget, supersede=True)
             return
             
         # Comandos normais a serem processados
         chat_widget = getattr(self, f"{mode}_chat_log")
         self._update_chat(chat_widget, "Você", command, mode)
-        self._generate_response(command, mode, chat_widget)
+        self._submit_request(command, mode, chat_widget, supersede=True)
 
     def _update_mode_indicator(self, event):
         """Atualiza indicador de modo"""
@@ -275,6 +317,8 @@ class AEGISInterface(ttk.Window):
 
     def on_close(self):
         """Encerra aplicação"""
+        self.ui_bus.stop()
+        self.request_scheduler.shutdown()
         self.voice_engine.stop()
         self.destroy()
 
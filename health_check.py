@@ -1,9 +1,10 @@
-import requests
 import time
 from config import Config
+from core.http_client import get_transport
 
-def api_health_check():
+def api_health_check(transport=None):
     """Check connectivity to DeepSeek API endpoints"""
+    transport = transport or get_transport()
     try:
         test_payload = {
             "model": "deepseek-chat",
@@ -11,8 +12,8 @@ def api_health_check():
             "max_tokens": 1
         }
         
-        response = requests.post(
-            Config.API_ENDPOINTS[0],
+        response = transport.post(
+            Config.DEEPSEEK_API_URL,
             headers={"Authorization": f"Bearer {Config.DEEPSEEK_API_KEY}"},
             json=test_payload,
             timeout=5
@@ -1,8 +1,10 @@
+import asyncio
 from textual import on, work
 from textual.app import App, ComposeResult
 from textual.containers import Container
+from textual.css.query import NoMatches
 from textual.widgets import Header, Footer, Input, Static
-from main import AEGIS  # Your existing core
+from core.cognitive_core import AsyncCognitiveCore
 from health_check import api_health_check
 
 
@@ -37,7 +39,7 @@ class AEGISInterface(App):
 
     def __init__(self):
         super().__init__()
-        self.ai_core = AEGIS()
+        self.ai_core = AsyncCognitiveCore()
         self.history = []
 
     def compose(self) -> ComposeResult:
@@ -64,15 +66,47 @@ class AEGISInterface(App):
 
     @work(exclusive=True)
     async def process_command(self, command: str) -> None:
-        response = self.ai_core.execute_directive(command)
-        self.history.append(("aegis", response))
+        # Worker exclusivo: uma nova entrada cancela a resposta anterior e fecha a conexão
+        response = self._start_response()
+        try:
+            async for chunk in self.ai_core.stream_response(command, "daily"):
+                self._append_response(response, chunk)
+        except asyncio.CancelledError:
+            # Substituído por uma nova entrada antes de responder: remove a resposta vazia
+            self._discard_empty_response(response)
+            raise
+        except Exception as e:
+            # Erros de rede/HTTP não podem escapar do worker (encerrariam o app)
+            self._discard_empty_response(response)
+            self.history.append(("error", f"Erro do sistema: {str(e)}"))
+            self.query_one("#history").update(self._format_history())
+            self.query_one("#history").scroll_end()
+
+    def _start_response(self) -> list:
+        # Cada worker altera a sua própria entrada: o worker cancelado pode terminar depois
+        # que o seguinte já acrescentou a dele
+        response = ["aegis", ""]
+        self.history.append(response)
+        return response
+
+    def _append_response(self, response: list, chunk: str) -> None:
+        response[1] += chunk
         self.query_one("#history").update(self._format_history())
         self.query_one("#history").scroll_end()
 
+    def _discard_empty_response(self, response: list) -> None:
+        if response[1]:
+            return
+        self.history = [entry for entry in self.history if entry is not response]
+        try:
+            self.query_one("#history").update(self._format_history())
+        except NoMatches:
+            pass  # cancelado no encerramento do app
+
     def _format_history(self) -> str:
         formatted = []
         for sender, message in self.history:
-            prefix = "YOU:" if sender == "user" else "A.E.G.I.S.:"
+            prefix = {"user": "YOU:", "error": "ERROR:"}.get(sender, "A.E.G.I.S.:")
             # Remove all markup formatting and use plain text
             formatted.append(f"{prefix}\n{message}\n")
         return "\n".join(formatted)
@@ -86,7 +120,11 @@ class AEGISInterface(App):
     async def key_ctrl_r(self) -> None:
         """Force system refresh"""
         self.query_one("#history").update("Reloading core systems...")
-        self.ai_core = AEGIS()
+        await self.ai_core.aclose()
+        self.ai_core = AsyncCognitiveCore()
+
+    async def on_unmount(self) -> None:
+        await self.ai_core.aclose()
 
 if __name__ == "__main__":
     app = AEGISInterface()